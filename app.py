@@ -1,12 +1,32 @@
 import streamlit as st
 import pandas as pd
-import re
-from collections import Counter
 import nltk
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 import plotly.express as px
 from datetime import datetime, timedelta
+import os
+from ticket_store import DEFAULT_STORE_DIR, load_tickets, store_version
+from topic_rules import TopicClassifier
+from text_index import build_term_index
+import ticket_cube
+from ticket_filter import TicketFilterIndex
+from perf_instrumentation import recorder
+from sku_extraction import SkuCatalogIndex, extract_sku_mentions, primary_skus, sku_match_summary
+
+# Tickets older than this are not loaded from the ticket store
+DASHBOARD_HISTORY_DAYS = 730
+
+# Optional JSON file overriding the built-in topic keyword rules
+TOPIC_RULES_FILE = 'topic_rules.json'
+
+# Optional JSON file of known SKU misspellings, e.g. {"SA-3012": "AS-3012"}
+SKU_ALIASES_FILE = 'sku_aliases.json'
+
+# Query parameter that reveals the Diagnostics page (?diagnostics=1)
+DIAGNOSTICS_QUERY_PARAM = 'diagnostics'
+
+# Stage records shown in the Diagnostics page's recent runs table
+DIAGNOSTICS_RECENT_RECORDS = 200
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -15,20 +35,29 @@ st.set_page_config(
     layout="wide"
 )
 
+# Every rerun of the script is one run in the performance records
+recorder.start_run()
+
 # --- NLTK Resource Check ---
 @st.cache_resource
 def ensure_nltk_resources():
-    for resource in ['punkt', 'stopwords']:
+    recorder.cache_miss('ensure_nltk_resources')
+    for resource in ['stopwords']:
         try:
-            nltk.data.find(f'tokenizers/{resource}' if resource == 'punkt' else f'corpora/{resource}')
+            nltk.data.find(f'corpora/{resource}')
         except LookupError:
             nltk.download(resource)
 
-ensure_nltk_resources()
+recorder.cached_call('ensure_nltk_resources', ensure_nltk_resources)
 
 # --- Caching Data Loading and All Processing ---
-@st.cache_data
-def load_and_process_data():
+# Keyed on the ticket store's version, so tickets upserted by the nightly ingestion
+# reach a running dashboard on the next rerun; only the latest load is kept.
+# The frame, term index, cube and rollup are large and only read afterwards, so they
+# are cached as shared resources instead of being unpickled again on every rerun.
+@st.cache_resource(max_entries=1)
+def load_and_process_data(store_key):
+    recorder.cache_miss('load_and_process_data')
     # (Data generation code is the same, collapsed for brevity)
     products_data = {
         'sku': ['AS-2801', 'AS-2802', 'AS-3011', 'AS-3012', 'AC-8100', 'AC-8200', 'VB-5001', 'SA-7850', 'SA-7851', 'AS-2803', 'AC-8300', 'VB-5002', 'SA-7900', 'AS-2804', 'AC-8400', 'VB-5003', 'SA-7950', 'AS-2805', 'AC-8500', 'VB-5004'],
@@ -37,73 +66,149 @@ def load_and_process_data():
         'brand': ['Audi', 'Audi', 'Audi', 'Audi', 'Audi', 'BMW', 'Audi', 'Mercedes', 'Mercedes', 'BMW', 'Mercedes', 'Mercedes', 'BMW', 'Land Rover', 'Land Rover', 'BMW', 'Porsche', 'Bentley', 'Porsche', 'Land Rover']
     }
     products_df = pd.DataFrame(products_data)
-    tickets_data = {
-        'ticket_id': range(1001, 1121),
-        'sku': ['AS-2801', 'AS-2802', 'AS-3011', 'AS-3012', 'AC-8100', 'AC-8200', 'VB-5001', 'SA-7850', 'SA-7851', 'AS-2803', 'AC-8300', 'VB-5002', 'SA-7900', 'AS-2804', 'AC-8400', 'VB-5003', 'SA-7950', 'AS-2805', 'AC-8500', 'VB-5004', 'AS-2801', 'AS-2802', 'AS-3011', 'AS-3012', 'AC-8100', 'AC-8200', 'VB-5001', 'SA-7850', 'SA-7851', 'AS-2803', 'AC-8300', 'VB-5002', 'SA-7900', 'AS-2804', 'AC-8400', 'VB-5003', 'SA-7950', 'AS-2805', 'AC-8500', 'VB-5004', 'AS-2801', 'AS-2802', 'AS-3011', 'AS-3012', 'AC-8100', 'AC-8200', 'VB-5001', 'SA-7850', 'SA-7851', 'AS-2803', 'AC-8300', 'VB-5002', 'SA-7900', 'AS-2804', 'AC-8400', 'VB-5003', 'SA-7950', 'AS-2805', 'AC-8500', 'VB-5004', 'AS-2801', 'AS-2802', 'AS-3011', 'AS-3012', 'AC-8100', 'AC-8200', 'VB-5001', 'SA-7850', 'SA-7851', 'AS-2803', 'AC-8300', 'VB-5002', 'SA-7900', 'AS-2804', 'AC-8400', 'VB-5003', 'SA-7950', 'AS-2805', 'AC-8500', 'VB-5004', 'AS-2801', 'AS-2802', 'AS-3011', 'AS-3012', 'AC-8100', 'AC-8200', 'VB-5001', 'SA-7850', 'SA-7851', 'AS-2803', 'AC-8300', 'VB-5002', 'SA-7900', 'AS-2804', 'AC-8400', 'VB-5003', 'SA-7950', 'AS-2805', 'AC-8500', 'VB-5004', 'SA-7850', 'AC-8200', 'AS-2803', 'AS-2801', 'SA-7950', 'AC-8400', 'VB-5001', 'SA-7900', 'AS-2804', 'VB-5004', 'SA-7850', 'AC-8200', 'AS-2803', 'AS-2801', 'SA-7950', 'AC-8400', 'VB-5001', 'SA-7900', 'AS-2804', 'VB-5004'],
-        'description': ["The AS-2801 air spring for my Audi A8 is leaking air. Poor quality.", "Rear air spring AS-2802 makes a hissing sound.", "How do I install the AS-3011 shock absorber?", "The SA-3012 for my Q7 is fantastic! Great ride quality.", "My AC-8100 compressor is very noisy.", "The AC-8200 BMW compressor arrived with a cracked housing.", "The VB-5001 valve block is stuck open.", "My SA-7850 Mercedes strut is leaking oil.", "SA-7851 rear strut failed after just one week.", "The AS-2803 air spring for my X5 was dead on arrival.", "AC-8300 compressor is getting extremely hot.", "The VB-5002 valve block doesn't fit my S-Class. I need to return it.", "SA-7900 strut for my BMW 5 series is a perfect fit. 5 stars.", "The AS-2804 Range Rover spring is sagging.", "My AC-8400 Land Rover compressor is weak.", "The VB-5003 for my X5 has a wiring issue.", "SA-7950 Panamera strut has a horrible clunking noise.", "The AS-2805 Bentley spring is not holding pressure.", "The AC-8500 Porsche compressor is leaking.", "VB-5004 valve block fixed my suspension problem. Thanks!", "Great value for the AS-2801 air spring.", "The AS-2802 was easy to install on my Audi.", "The AS-3011 shock absorber is a quality part.", "My mechanic loves the AS-3012 for the Q7.", "Shipping for the AC-8100 was very slow.", "The AC-8200 compressor is powerful and quiet.", "The VB-5001 valve block was a perfect OEM replacement.", "My Mercedes S-Class rides like new with the SA-7850.", "The SA-7851 strut was a great price.", "My BMW X5 is level again thanks to the AS-2803.", "The AC-8300 is a fantastic compressor.", "The VB-5002 was easy to wire up.", "The SA-7900 provides a comfortable ride.", "My ENG-014 kit came with everything needed.", "The FLT-015 cabin filter is great.", "The EXH-016 muffler has a nice deep tone.", "LGT-017 tail lights were plug-and-play.", "My fuel economy improved with the ELEC-018 MAF.", "FUEL-019 injectors gave a noticeable power boost.", "All gaskets in the ENG-020 set were a perfect fit.", "The AS-2801 didn't last long. I want to return it.", "AS-2802 air spring has a slow leak.", "The AS-3011 ride is too harsh.", "AS-3012 is a cheap knockoff. I'm returning it.", "The AC-8100 compressor is burning out.", "AC-8200 is making a grinding noise.", "The VB-5001 is leaking from the fittings.", "My SA-7850 strut is defective.", "The SA-7851 failed and left me stranded.", "AS-2803 doesn't hold air overnight. Needs to be returned.", "The AC-8300 compressor failed after a month. Defective product.", "The threads on the VB-5002 are wrong. I need to return this.", "The SA-7900 is not as good as the original.", "The AS-2804 is a poor quality spring.", "AC-8400 compressor is not building enough pressure.", "The VB-5003 is faulty.", "My SA-7950 strut is noisy over bumps.", "The AS-2805 bag is torn. Clearly a defect.", "AC-8500 compressor doesn't work. Return needed.", "The VB-5004 is a cheap plastic part. I will be returning it.", "What is the warranty on the AS-2801?", "Do I need new bolts for the AS-2802?", "Is there a video for the AS-3011 install?", "What are the torque specs for the AS-3012?", "Is AC-8100 a direct replacement for my Audi?", "Do I need to program the car after installing the AC-8200?", "Is the VB-5001 easy to replace?", "Does the SA-7850 come with a new seal?", "What is the warranty on the SA-7851?", "Compatibility check for AS-2803 on a 2012 X5.", "Do you have a guide for the AC-8300 install?", "Are the VB-5002 fittings included?", "How much stiffer is the SA-7900 than stock?", "What is the service interval for the AS-2804?", "How often should I replace the AC-8400 relay?", "What's the diameter of the VB-5003 air lines?", "Is the SA-7950 for the left or right side?", "Question about AS-2805 pressure.", "Is the AC-8500 a twin-piston compressor?", "Does the VB-5004 include o-rings?", "AS-2801 arrived with a cracked top mount.", "The box for AS-2802 was damaged.", "My AS-3011 shock was missing from the order.", "AS-3012 arrived with scratches.", "The AC-8100 compressor was lost in shipping.", "The AC-8200 I received looks used. I am returning this.", "The VB-5001 airline fitting was bent.", "SA-7850 has a dent on the body.", "You sent the wrong SA-7851 strut. I need to return it.", "The AS-2803 air spring box was open.", "The AC-8300 compressor housing is cracked.", "VB-5002 was left in the rain by the courier.", "The SA-7900 has the wrong wiring connector.", "The AS-2804 kit is missing the o-ring.", "The AC-8400 is the wrong model for my Rover. Return.", "The VB-5003 was supposed to be new, but it's refurbished.", "SA-7950 is for the wrong model year Panamera. Returning it.", "You sent the wrong AS-2805. Please process a return.", "The AC-8500 is not the one I ordered. Initiating a return.", "The VB-5004 is for a different car. I have to return it.", "I love the AS-3012 kit! My Audi feels brand new.", "The AS-2802 air spring is a nightmare, so much noise.", "The AC-8100 is a piece of junk. Failed in a week.", "AC-8200 is the best money I've ever spent.", "The AS-2801 is decent for the price.", "The ride from the SA-7850 is perfect!", "SA-7851 is a perfect fit, very high quality.", "AS-2803 is a safety hazard, it collapsed while driving.", "AC-8300 pump left me stranded.", "The AS-2804 failed and cost me thousands in repairs.", "I'm very disappointed with the SA-7900 ride quality.", "Your customer service was amazing sorting out my AS-2802 issue.", "AC-8100 compressor is working great so far.", "The AC-8200 is giving me constant error codes.", "The AS-2801 was a small but noticeable improvement.", "The noise from the SA-7850 is giving me a headache.", "The SA-7851 was a pain to install.", "AS-2803 install was super easy.", "The AC-8300 works as advertised.", "I'm worried about the reliability of the AS-2804 kit."],
-    }
-    tickets_df = pd.DataFrame(tickets_data)
-    end_date = datetime.today()
-    start_date = end_date - timedelta(days=730)
-    date_range_for_sampling = pd.date_range(start=start_date, end=end_date)
-    random_dates = date_range_for_sampling.to_series().sample(n=len(tickets_df), replace=True).sort_values()
-    tickets_df['created_date'] = random_dates.values
-    df = pd.merge(tickets_df, products_df, on='sku', how='left')
-    def clean_text(text):
-        text = text.lower()
-        text = re.sub(r'[^\w\s]', '', text)
-        tokens = word_tokenize(text)
-        stop_words = set(stopwords.words('english'))
-        return [word for word in tokens if word not in stop_words]
-    df['cleaned_description'] = df['description'].apply(clean_text)
-    def classify_ticket_topic(description):
-        description = description.lower()
-        if any(word in description for word in ['return', 'wrong', 'sent', 'returning', 'refund']): return 'Return'
-        elif any(word in description for word in ['fail', 'broken', 'defective', 'leak', 'noise', 'cracked', 'sagging', 'weak', 'faulty', 'torn', 'dead on arrival']): return 'Defect'
-        else: return 'Question'
-    df['topic'] = df['description'].apply(classify_ticket_topic)
-    return df
+    tickets_df = None
+    if os.path.isdir(DEFAULT_STORE_DIR):
+        # Only the columns and month partitions the dashboard uses are read from the store
+        history_start = datetime.today() - timedelta(days=DASHBOARD_HISTORY_DAYS)
+        with recorder.stage('store_load') as stage:
+            tickets_df = load_tickets(DEFAULT_STORE_DIR, columns=['id', 'created_at', 'subject', 'description', 'custom_fields'], start=history_start)
+            stage['rows'] = len(tickets_df)
+        # An empty store (e.g. left behind by a failed ingestion) falls back to the sample data
+        if tickets_df.empty:
+            st.warning(f"No tickets from the last {DASHBOARD_HISTORY_DAYS} days in '{DEFAULT_STORE_DIR}'. Showing the sample data instead.")
+            tickets_df = None
+    if tickets_df is not None:
+        tickets_df = tickets_df.rename(columns={'id': 'ticket_id', 'created_at': 'created_date'})
+        tickets_df['created_date'] = tickets_df['created_date'].dt.tz_convert(None)
+        tickets_df['description'] = tickets_df['description'].fillna('')
+        # Raw tickets have no sku column: codes are found in the text and resolved against the catalog
+        with recorder.stage('sku_extraction', rows=len(tickets_df)):
+            sku_index = SkuCatalogIndex.from_catalog(products_df, SKU_ALIASES_FILE if os.path.exists(SKU_ALIASES_FILE) else None)
+            sku_mentions = extract_sku_mentions(tickets_df, sku_index)
+            tickets_df['sku'] = primary_skus(sku_mentions, tickets_df.index)
+            sku_report = sku_match_summary(sku_mentions, len(tickets_df))
+        tickets_df = tickets_df.drop(columns=['subject', 'custom_fields'])
+    else:
+        tickets_data = {
+            'ticket_id': range(1001, 1121),
+            'sku': ['AS-2801', 'AS-2802', 'AS-3011', 'AS-3012', 'AC-8100', 'AC-8200', 'VB-5001', 'SA-7850', 'SA-7851', 'AS-2803', 'AC-8300', 'VB-5002', 'SA-7900', 'AS-2804', 'AC-8400', 'VB-5003', 'SA-7950', 'AS-2805', 'AC-8500', 'VB-5004', 'AS-2801', 'AS-2802', 'AS-3011', 'AS-3012', 'AC-8100', 'AC-8200', 'VB-5001', 'SA-7850', 'SA-7851', 'AS-2803', 'AC-8300', 'VB-5002', 'SA-7900', 'AS-2804', 'AC-8400', 'VB-5003', 'SA-7950', 'AS-2805', 'AC-8500', 'VB-5004', 'AS-2801', 'AS-2802', 'AS-3011', 'AS-3012', 'AC-8100', 'AC-8200', 'VB-5001', 'SA-7850', 'SA-7851', 'AS-2803', 'AC-8300', 'VB-5002', 'SA-7900', 'AS-2804', 'AC-8400', 'VB-5003', 'SA-7950', 'AS-2805', 'AC-8500', 'VB-5004', 'AS-2801', 'AS-2802', 'AS-3011', 'AS-3012', 'AC-8100', 'AC-8200', 'VB-5001', 'SA-7850', 'SA-7851', 'AS-2803', 'AC-8300', 'VB-5002', 'SA-7900', 'AS-2804', 'AC-8400', 'VB-5003', 'SA-7950', 'AS-2805', 'AC-8500', 'VB-5004', 'AS-2801', 'AS-2802', 'AS-3011', 'AS-3012', 'AC-8100', 'AC-8200', 'VB-5001', 'SA-7850', 'SA-7851', 'AS-2803', 'AC-8300', 'VB-5002', 'SA-7900', 'AS-2804', 'AC-8400', 'VB-5003', 'SA-7950', 'AS-2805', 'AC-8500', 'VB-5004', 'SA-7850', 'AC-8200', 'AS-2803', 'AS-2801', 'SA-7950', 'AC-8400', 'VB-5001', 'SA-7900', 'AS-2804', 'VB-5004', 'SA-7850', 'AC-8200', 'AS-2803', 'AS-2801', 'SA-7950', 'AC-8400', 'VB-5001', 'SA-7900', 'AS-2804', 'VB-5004'],
+            'description': ["The AS-2801 air spring for my Audi A8 is leaking air. Poor quality.", "Rear air spring AS-2802 makes a hissing sound.", "How do I install the AS-3011 shock absorber?", "The SA-3012 for my Q7 is fantastic! Great ride quality.", "My AC-8100 compressor is very noisy.", "The AC-8200 BMW compressor arrived with a cracked housing.", "The VB-5001 valve block is stuck open.", "My SA-7850 Mercedes strut is leaking oil.", "SA-7851 rear strut failed after just one week.", "The AS-2803 air spring for my X5 was dead on arrival.", "AC-8300 compressor is getting extremely hot.", "The VB-5002 valve block doesn't fit my S-Class. I need to return it.", "SA-7900 strut for my BMW 5 series is a perfect fit. 5 stars.", "The AS-2804 Range Rover spring is sagging.", "My AC-8400 Land Rover compressor is weak.", "The VB-5003 for my X5 has a wiring issue.", "SA-7950 Panamera strut has a horrible clunking noise.", "The AS-2805 Bentley spring is not holding pressure.", "The AC-8500 Porsche compressor is leaking.", "VB-5004 valve block fixed my suspension problem. Thanks!", "Great value for the AS-2801 air spring.", "The AS-2802 was easy to install on my Audi.", "The AS-3011 shock absorber is a quality part.", "My mechanic loves the AS-3012 for the Q7.", "Shipping for the AC-8100 was very slow.", "The AC-8200 compressor is powerful and quiet.", "The VB-5001 valve block was a perfect OEM replacement.", "My Mercedes S-Class rides like new with the SA-7850.", "The SA-7851 strut was a great price.", "My BMW X5 is level again thanks to the AS-2803.", "The AC-8300 is a fantastic compressor.", "The VB-5002 was easy to wire up.", "The SA-7900 provides a comfortable ride.", "My ENG-014 kit came with everything needed.", "The FLT-015 cabin filter is great.", "The EXH-016 muffler has a nice deep tone.", "LGT-017 tail lights were plug-and-play.", "My fuel economy improved with the ELEC-018 MAF.", "FUEL-019 injectors gave a noticeable power boost.", "All gaskets in the ENG-020 set were a perfect fit.", "The AS-2801 didn't last long. I want to return it.", "AS-2802 air spring has a slow leak.", "The AS-3011 ride is too harsh.", "AS-3012 is a cheap knockoff. I'm returning it.", "The AC-8100 compressor is burning out.", "AC-8200 is making a grinding noise.", "The VB-5001 is leaking from the fittings.", "My SA-7850 strut is defective.", "The SA-7851 failed and left me stranded.", "AS-2803 doesn't hold air overnight. Needs to be returned.", "The AC-8300 compressor failed after a month. Defective product.", "The threads on the VB-5002 are wrong. I need to return this.", "The SA-7900 is not as good as the original.", "The AS-2804 is a poor quality spring.", "AC-8400 compressor is not building enough pressure.", "The VB-5003 is faulty.", "My SA-7950 strut is noisy over bumps.", "The AS-2805 bag is torn. Clearly a defect.", "AC-8500 compressor doesn't work. Return needed.", "The VB-5004 is a cheap plastic part. I will be returning it.", "What is the warranty on the AS-2801?", "Do I need new bolts for the AS-2802?", "Is there a video for the AS-3011 install?", "What are the torque specs for the AS-3012?", "Is AC-8100 a direct replacement for my Audi?", "Do I need to program the car after installing the AC-8200?", "Is the VB-5001 easy to replace?", "Does the SA-7850 come with a new seal?", "What is the warranty on the SA-7851?", "Compatibility check for AS-2803 on a 2012 X5.", "Do you have a guide for the AC-8300 install?", "Are the VB-5002 fittings included?", "How much stiffer is the SA-7900 than stock?", "What is the service interval for the AS-2804?", "How often should I replace the AC-8400 relay?", "What's the diameter of the VB-5003 air lines?", "Is the SA-7950 for the left or right side?", "Question about AS-2805 pressure.", "Is the AC-8500 a twin-piston compressor?", "Does the VB-5004 include o-rings?", "AS-2801 arrived with a cracked top mount.", "The box for AS-2802 was damaged.", "My AS-3011 shock was missing from the order.", "AS-3012 arrived with scratches.", "The AC-8100 compressor was lost in shipping.", "The AC-8200 I received looks used. I am returning this.", "The VB-5001 airline fitting was bent.", "SA-7850 has a dent on the body.", "You sent the wrong SA-7851 strut. I need to return it.", "The AS-2803 air spring box was open.", "The AC-8300 compressor housing is cracked.", "VB-5002 was left in the rain by the courier.", "The SA-7900 has the wrong wiring connector.", "The AS-2804 kit is missing the o-ring.", "The AC-8400 is the wrong model for my Rover. Return.", "The VB-5003 was supposed to be new, but it's refurbished.", "SA-7950 is for the wrong model year Panamera. Returning it.", "You sent the wrong AS-2805. Please process a return.", "The AC-8500 is not the one I ordered. Initiating a return.", "The VB-5004 is for a different car. I have to return it.", "I love the AS-3012 kit! My Audi feels brand new.", "The AS-2802 air spring is a nightmare, so much noise.", "The AC-8100 is a piece of junk. Failed in a week.", "AC-8200 is the best money I've ever spent.", "The AS-2801 is decent for the price.", "The ride from the SA-7850 is perfect!", "SA-7851 is a perfect fit, very high quality.", "AS-2803 is a safety hazard, it collapsed while driving.", "AC-8300 pump left me stranded.", "The AS-2804 failed and cost me thousands in repairs.", "I'm very disappointed with the SA-7900 ride quality.", "Your customer service was amazing sorting out my AS-2802 issue.", "AC-8100 compressor is working great so far.", "The AC-8200 is giving me constant error codes.", "The AS-2801 was a small but noticeable improvement.", "The noise from the SA-7850 is giving me a headache.", "The SA-7851 was a pain to install.", "AS-2803 install was super easy.", "The AC-8300 works as advertised.", "I'm worried about the reliability of the AS-2804 kit."],
+        }
+        tickets_df = pd.DataFrame(tickets_data)
+        end_date = datetime.today()
+        start_date = end_date - timedelta(days=730)
+        date_range_for_sampling = pd.date_range(start=start_date, end=end_date)
+        random_dates = date_range_for_sampling.to_series().sample(n=len(tickets_df), replace=True).sort_values()
+        tickets_df['created_date'] = random_dates.values
+        # The sample tickets come with their sku already assigned
+        sku_report = None
+    with recorder.stage('product_join', rows=len(tickets_df)):
+        df = pd.merge(tickets_df, products_df, on='sku', how='left')
+        # The filter index and the term-document matrix both address tickets by row position
+        df = df.sort_values('created_date', kind='stable').reset_index(drop=True)
+    with recorder.stage('tokenization', rows=len(df)):
+        term_index = build_term_index(df['description'], set(stopwords.words('english')))
+    with recorder.stage('topic_classification', rows=len(df)):
+        classifier = TopicClassifier.from_config(TOPIC_RULES_FILE) if os.path.exists(TOPIC_RULES_FILE) else TopicClassifier()
+        df['topic'] = classifier.classify(df['description'])
+    # The cube is rebuilt from the loaded tickets whenever the store version changes; a
+    # full rebuild always reflects the latest version of re-upserted tickets
+    with recorder.stage('cube_build') as stage:
+        cube = ticket_cube.build_ticket_cube(df)
+        rollup = ticket_cube.build_topic_rollup(cube)
+        stage['rows'] = len(cube)
+    # Identifies this load, so resources built from it are never reused for another load
+    data_version = int(pd.util.hash_pandas_object(df[['ticket_id', 'created_date']], index=False).sum())
+    return df, term_index, cube, rollup, sku_report, data_version
 
 # --- Load the Data ---
-df = load_and_process_data()
+with recorder.stage('store_version'):
+    current_store_version = store_version(DEFAULT_STORE_DIR)
+df, term_index, cube, rollup, sku_report, data_version = recorder.cached_call('load_and_process_data', load_and_process_data, current_store_version, rows=lambda result: len(result[0]))
+
+# Built once per data load; cached page selections survive reruns and sessions.
+# The frame itself is not hashed, so the index is keyed on the load's data_version.
+@st.cache_resource(max_entries=1)
+def get_filter_index(_df, data_version):
+    recorder.cache_miss('get_filter_index')
+    return TicketFilterIndex(_df)
+
+filter_index = recorder.cached_call('get_filter_index', get_filter_index, df, data_version)
 
 # --- Reusable Function for Topic Analysis Pages ---
-def create_analysis_page(page_topic, dataframe):
+def create_analysis_page(page_topic, topic_rows, rollup_selection):
     st.title(f"🔎 {page_topic} Analysis")
-    topic_df = dataframe[dataframe['topic'] == page_topic]
-    st.header(f"Filtered Results: {len(topic_df)} {page_topic} Tickets")
-    total_topic_tickets = len(topic_df)
-    total_tickets = len(dataframe)
-    topic_percentage = total_topic_tickets / total_tickets * 100 if total_tickets > 0 else 0
+    with recorder.stage('topic_metrics', rows=len(rollup_selection)):
+        total_topic_tickets = int(ticket_cube.topic_totals(rollup_selection).get(page_topic, 0))
+        topic_percentage = ticket_cube.topic_rates(rollup_selection, [page_topic])[page_topic]
+    st.header(f"Filtered Results: {total_topic_tickets} {page_topic} Tickets")
     col1, col2 = st.columns(2)
     col1.metric(f"Total {page_topic} Tickets", f"{total_topic_tickets}")
     col2.metric(f"% of All Tickets in Filter", f"{topic_percentage:.1f}%")
     st.subheader(f"Top 5 Products with Most '{page_topic}' Tickets")
-    if not topic_df.empty:
-        top_products = topic_df['product_name'].value_counts().reset_index()
+    with recorder.stage('top_products') as stage:
+        cube_selection = product_cube_selection()
+        top_products = ticket_cube.top_products(cube_selection, page_topic, 5).reset_index()
+        stage['rows'] = len(cube_selection)
+    if total_topic_tickets > 0:
         top_products.columns = ['Product Name', f'Number of {page_topic}s']
-        st.dataframe(top_products.head(5), use_container_width=True, hide_index=True)
+        st.dataframe(top_products, use_container_width=True, hide_index=True)
     else:
         st.info(f"No '{page_topic}' tickets found for the selected filters.")
     st.subheader(f"Common Words in '{page_topic}' Tickets")
-    if not topic_df.empty:
-        topic_words = [word for tokens in topic_df['cleaned_description'] for word in tokens]
-        word_counts = Counter(topic_words)
-        pain_points_df = pd.DataFrame(word_counts.most_common(10), columns=['Word', 'Frequency'])
+    if len(topic_rows) > 0:
+        with recorder.stage('common_words', rows=len(topic_rows)):
+            pain_points_df = term_index.top_terms_frame(topic_rows, 10)
         st.dataframe(pain_points_df, use_container_width=True, hide_index=True)
     else:
         st.info(f"No text to analyze for '{page_topic}' tickets.")
     with st.expander("View Raw Data for this Topic"):
-        st.dataframe(topic_df)
+        st.dataframe(df.iloc[topic_rows])
+
+def create_diagnostics_page():
+    st.title("⏱️ Diagnostics")
+    st.caption(f"Run {recorder.current_run} of this process. Stage timings cover every session served by this process.")
+    st.header("Stages")
+    st.dataframe(recorder.stage_summary(), use_container_width=True, hide_index=True)
+    st.header("Caches")
+    st.dataframe(recorder.cache_summary(), use_container_width=True, hide_index=True)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Filter Cache Hits", f"{filter_index.hits}")
+    col2.metric("Filter Cache Misses", f"{filter_index.misses}")
+    filter_lookups = filter_index.hits + filter_index.misses
+    col3.metric("Filter Cache Hit Rate", f"{filter_index.hits / filter_lookups * 100 if filter_lookups else 0:.1f}%")
+    st.header("SKU Matching")
+    if sku_report is None:
+        st.info("The sample tickets come with their SKUs; codes are only extracted from tickets loaded from the ticket store.")
+    else:
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Tickets with Codes", f"{sku_report['tickets_with_codes']} of {sku_report['tickets']}")
+        col2.metric("Matched to Catalog", f"{sku_report['tickets_matched']}")
+        col3.metric("Several SKUs", f"{sku_report['tickets_with_several_skus']}")
+        col4.metric("Alias Matches", f"{sku_report['alias_matches']}")
+        st.subheader("Unmatched Codes")
+        st.dataframe(sku_report['unmatched_codes'], use_container_width=True, hide_index=True)
+    st.header("Recent Runs")
+    records = recorder.to_frame()
+    st.dataframe(records.tail(DIAGNOSTICS_RECENT_RECORDS).iloc[::-1], use_container_width=True, hide_index=True)
+    col1, col2 = st.columns(2)
+    col1.download_button("Download JSON", recorder.to_json(), file_name="diagnostics.json", mime="application/json")
+    col2.download_button("Download CSV", recorder.to_csv(), file_name="diagnostics.csv", mime="text/csv")
 
 # --- SIDEBAR ---
 st.sidebar.title("Navigation")
 page_options = ["Overall Dashboard", "Product Deep Dive", "Return Analysis", "Defect Analysis", "Question Analysis"]
+# The Diagnostics page is hidden unless the URL asks for it
+if st.query_params.get(DIAGNOSTICS_QUERY_PARAM) == '1':
+    page_options.append("Diagnostics")
 page = st.sidebar.radio("Go to", page_options)
 
 st.sidebar.header("Global Filter Options")
 today = datetime.today().date()
-min_data_date = df['created_date'].min().date()
+min_data_date = filter_index.min_date()
+if min_data_date is None:
+    st.warning("There are no tickets to show.")
+    st.stop()
 start_date = st.sidebar.date_input("Start Date", value=min_data_date, min_value=min_data_date, max_value=today)
 end_date = st.sidebar.date_input("End Date", value=today, min_value=min_data_date, max_value=today)
 if start_date > end_date:
@@ -111,37 +216,42 @@ if start_date > end_date:
     st.stop()
 
 # ADDED BRAND FILTER BACK
-brand_list = ['All Brands'] + sorted([str(b) for b in df['brand'].dropna().unique()])
+brand_list = ['All Brands'] + sorted([str(b) for b in filter_index.values('brand')])
 selected_brand = st.sidebar.selectbox("Filter by Brand", brand_list)
 
-# Apply global filters
-df_selection = df[(df['created_date'].dt.date >= start_date) & (df['created_date'].dt.date <= end_date)]
-if selected_brand != 'All Brands':
-    df_selection = df_selection[df_selection['brand'] == selected_brand]
+# Apply global filters: metrics come from the rollup, product views from the SKU-grain
+# cube and row positions from the filter index
+brand_filter = None if selected_brand == 'All Brands' else selected_brand
+with recorder.stage('sidebar_filter') as stage:
+    rollup_selection = ticket_cube.slice_cube(rollup, start_date, end_date, brand_filter)
+    stage['rows'] = len(rollup_selection)
+
+def product_cube_selection():
+    return ticket_cube.slice_cube(cube, start_date, end_date, brand_filter)
+
+def topic_page_rows(page_topic):
+    with recorder.stage('page_selection') as stage:
+        rows = filter_index.page_selection(start_date, end_date, brand_filter, page, topic=page_topic)
+        stage['rows'] = len(rows)
+    return rows
 
 # --- PAGE ROUTING ---
 if page == "Overall Dashboard":
     st.title("🛠️ Aerosus Data Analyzer")
-    st.header(f"Filtered Results: {len(df_selection)} of {len(df)} Total Tickets")
-    total_tickets = len(df_selection)
-    if total_tickets > 0:
-        defect_rate = len(df_selection[df_selection['topic'] == 'Defect']) / total_tickets * 100
-        return_rate = len(df_selection[df_selection['topic'] == 'Return']) / total_tickets * 100
-        question_rate = len(df_selection[df_selection['topic'] == 'Question']) / total_tickets * 100
-    else:
-        defect_rate, return_rate, question_rate = 0, 0, 0
+    with recorder.stage('overall_metrics', rows=len(rollup_selection)):
+        total_tickets = ticket_cube.total_tickets(rollup_selection)
+        rates = ticket_cube.topic_rates(rollup_selection, ['Defect', 'Return', 'Question'])
+    st.header(f"Filtered Results: {total_tickets} of {len(df)} Total Tickets")
+    defect_rate, return_rate, question_rate = rates['Defect'], rates['Return'], rates['Question']
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Total Tickets", f"{total_tickets}")
     col2.metric("Defect Rate", f"{defect_rate:.1f}%")
     col3.metric("Return Rate", f"{return_rate:.1f}%")
     col4.metric("Question Rate", f"{question_rate:.1f}%")
     st.header("Problem Trends Over Time")
-    if not df_selection.empty:
-        df_selection.loc[:, 'month'] = df_selection['created_date'].dt.to_period('M').astype(str)
-        monthly_analysis = df_selection.groupby('month').agg(
-            Defect_Tickets=('topic', lambda x: (x == 'Defect').sum()),
-            Return_Tickets=('topic', lambda x: (x == 'Return').sum())
-        ).reset_index()
+    if total_tickets > 0:
+        with recorder.stage('trend_groupby', rows=len(rollup_selection)):
+            monthly_analysis = ticket_cube.monthly_topic_trend(rollup_selection, ['Defect', 'Return'])
         fig_trends = px.line(
             monthly_analysis, x='month', y=['Defect_Tickets', 'Return_Tickets'],
             title="Defect & Return Tickets Per Month", labels={'value': 'Number of Tickets', 'month': 'Month'}
@@ -153,22 +263,25 @@ elif page == "Product Deep Dive":
     st.title("🔎 Product Deep Dive Report")
     st.info("Use the **global brand filter** in the sidebar to narrow down the product list below.")
     
-    products_in_selection = sorted(df_selection['product_name'].unique())
+    cube_selection = product_cube_selection()
+    products_in_selection = ticket_cube.products_in(cube_selection)
     if not products_in_selection:
         st.warning("No products available for the selected Brand and Date range.")
     else:
 
         product_to_analyze = st.selectbox("Select a Product to Analyze", options=products_in_selection)
         if product_to_analyze:
-            product_df = df_selection[df_selection['product_name'] == product_to_analyze]
+            with recorder.stage('page_selection') as stage:
+                page_rows = filter_index.page_selection(start_date, end_date, brand_filter, page)
+                product_rows = filter_index.restrict(page_rows, 'product_name', product_to_analyze)
+                stage['rows'] = len(product_rows)
             st.subheader(f"Metrics for: {product_to_analyze}")
             
-            total_prod_tickets = len(product_df)
-            if total_prod_tickets > 0:
-                defect_rate_prod = len(product_df[product_df['topic'] == 'Defect']) / total_prod_tickets * 100
-                return_rate_prod = len(product_df[product_df['topic'] == 'Return']) / total_prod_tickets * 100
-            else:
-                defect_rate_prod, return_rate_prod = 0, 0
+            with recorder.stage('product_metrics', rows=len(cube_selection)):
+                product_cells = ticket_cube.product_cells(cube_selection, product_to_analyze)
+                total_prod_tickets = ticket_cube.total_tickets(product_cells)
+                product_rates = ticket_cube.topic_rates(product_cells, ['Defect', 'Return'])
+            defect_rate_prod, return_rate_prod = product_rates['Defect'], product_rates['Return']
 
             col1p, col2p, col3p = st.columns(3)
             col1p.metric("Total Tickets for this Product", f"{total_prod_tickets}")
@@ -176,25 +289,26 @@ elif page == "Product Deep Dive":
             col3p.metric("Return Rate", f"{return_rate_prod:.1f}%")
 
             st.subheader("Common Complaint Words (from Defect & Return tickets)")
-            problem_df = product_df[product_df['topic'].isin(['Defect', 'Return'])]
-            if not problem_df.empty:
-                problem_words = [word for tokens in problem_df['cleaned_description'] for word in tokens]
-                pain_point_counts = Counter(problem_words)
-                pain_points_df = pd.DataFrame(pain_point_counts.most_common(5), columns=['Complaint Word', 'Frequency'])
+            problem_rows = filter_index.restrict(product_rows, 'topic', ['Defect', 'Return'])
+            if len(problem_rows) > 0:
+                with recorder.stage('common_words', rows=len(problem_rows)):
+                    pain_points_df = term_index.top_terms_frame(problem_rows, 5, columns=['Complaint Word', 'Frequency'])
                 st.dataframe(pain_points_df, use_container_width=True, hide_index=True)
             else:
                 st.info("No defect or return tickets found for this product.")
             
             with st.expander("View Recent Tickets for this Product"):
-                st.dataframe(product_df[['created_date', 'description', 'topic']])
+                st.dataframe(df.iloc[product_rows][['created_date', 'description', 'topic']])
 
 # Rest of the page routing
 elif page == "Return Analysis":
-    create_analysis_page("Return", df_selection)
+    create_analysis_page("Return", topic_page_rows("Return"), rollup_selection)
 elif page == "Defect Analysis":
-    create_analysis_page("Defect", df_selection)
+    create_analysis_page("Defect", topic_page_rows("Defect"), rollup_selection)
 elif page == "Question Analysis":
-    create_analysis_page("Question", df_selection)
+    create_analysis_page("Question", topic_page_rows("Question"), rollup_selection)
+elif page == "Diagnostics":
+    create_diagnostics_page()
 
 
 #
\ No newline at end of file
@@ -0,0 +1,287 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import nltk
+from nltk.corpus import stopwords
+
+import ticket_cube
+from data_profiler import stream_zendesk_jsonl
+from perf_instrumentation import peak_rss_mb
+from sku_extraction import SkuCatalogIndex, extract_sku_mentions, primary_skus
+from synthetic_data import generate_product_catalog, write_zendesk_export
+from text_index import build_term_index
+from ticket_filter import TicketFilterIndex
+from ticket_store import load_tickets
+from topic_rules import TopicClassifier
+
+DEFAULT_SIZES = [10000, 100000]
+
+# Sidebar states replayed by the filtering and page aggregation stages
+SIDEBAR_STATES_PER_RUN = 20
+
+PAGES = ["Overall Dashboard", "Product Deep Dive", "Return Analysis", "Defect Analysis", "Question Analysis"]
+
+# Per-stage Arrow memory pools; buffers from a stage are freed through its pool, so they are never dropped
+_STAGE_POOLS = []
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _english_stop_words():
+    try:
+        return set(stopwords.words('english'))
+    except LookupError:
+        nltk.download('stopwords')
+        return set(stopwords.words('english'))
+
+
+def _mb(value):
+    return '-' if value is None else f"{value:.1f}"
+
+
+def measure(results, n_tickets, stage, fn, track_memory=True):
+    """
+    Runs one stage and records wall time, rows produced and memory:
+    - python_peak_mb: tracemalloc peak, i.e. Python objects and numpy buffers.
+      It does not see Arrow buffers (pandas str columns, parquet I/O, the
+      regex kernels) or worker processes.
+    - arrow_peak_mb / arrow_allocated_mb: peak and total bytes of Arrow
+      allocations, from a memory pool installed as the default for the stage.
+    - rss_growth_mb: how far the stage raised the process's peak RSS; 0 when
+      an earlier stage peaked higher.
+    - child_peak_rss_mb: peak RSS of the largest worker process, when the
+      stage ran workers that raised it.
+    fn returns (value, rows); the value is passed back to the caller.
+    """
+    base_pool = pa.default_memory_pool()
+    stage_pool = pa.proxy_memory_pool(base_pool)
+    _STAGE_POOLS.append(stage_pool)
+    rss_before, child_rss_before = peak_rss_mb(), peak_rss_mb(children=True)
+    if track_memory:
+        tracemalloc.start()
+    pa.set_memory_pool(stage_pool)
+    started = time.perf_counter()
+    try:
+        value, rows = fn()
+    finally:
+        seconds = time.perf_counter() - started
+        pa.set_memory_pool(base_pool)
+    python_peak_mb = None
+    if track_memory:
+        python_peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    rss_after, child_rss_after = peak_rss_mb(), peak_rss_mb(children=True)
+    record = {
+        'tickets': n_tickets, 'stage': stage, 'seconds': seconds, 'rows': rows,
+        'python_peak_mb': python_peak_mb,
+        'arrow_peak_mb': stage_pool.max_memory() / 1e6,
+        'arrow_allocated_mb': stage_pool.total_bytes_allocated() / 1e6,
+        'rss_growth_mb': None if rss_after is None else rss_after - rss_before,
+        'child_peak_rss_mb': child_rss_after if child_rss_after is not None and child_rss_after > child_rss_before else None,
+    }
+    results.append(record)
+    print(f"{n_tickets:>10} | {stage:<24} | {seconds:8.3f}s | {_mb(python_peak_mb):>9} | {_mb(record['arrow_peak_mb']):>9} | "
+          f"{_mb(record['rss_growth_mb']):>9} | {_mb(record['child_peak_rss_mb']):>9} | {rows} rows")
+    return value
+
+
+def _sidebar_states(filter_index, n_states, seed=0):
+    rng = np.random.default_rng(seed)
+    first, last = filter_index.min_date(), pd.Timestamp(filter_index.dates[-1]).date()
+    days = (last - first).days
+    brands = [None] + filter_index.values('brand')
+    states = []
+    for i in range(n_states):
+        lo, hi = sorted(rng.integers(0, days + 1, size=2))
+        start_date = first + timedelta(days=int(lo))
+        end_date = first + timedelta(days=int(hi))
+        states.append((start_date, end_date, brands[rng.integers(len(brands))], PAGES[i % len(PAGES)]))
+    return states
+
+
+def _page_topic(page):
+    return page.split()[0] if page.endswith('Analysis') else None
+
+
+def benchmark_pipeline(n_tickets, workdir, results, workers=1, track_memory=True, seed=0):
+    """
+    Generates a synthetic export of n_tickets and times every stage between the
+    raw JSON Lines file and the rendered dashboard pages.
+    """
+    catalog = generate_product_catalog(max(20, n_tickets // 500), seed=seed)
+    export_path = os.path.join(workdir, f"tickets_{n_tickets}.jsonl")
+    store_dir = os.path.join(workdir, f"store_{n_tickets}")
+    write_zendesk_export(export_path, n_tickets, catalog, seed=seed)
+    stop_words = _english_stop_words()
+
+    def run(stage, fn):
+        return measure(results, n_tickets, stage, fn, track_memory)
+
+    def ingest():
+        stats = stream_zendesk_jsonl(export_path, store_dir, workers=workers)
+        return stats, stats['tickets']
+    run('ingestion', ingest)
+
+    def store_load():
+        tickets_df = load_tickets(store_dir, columns=['id', 'created_at', 'subject', 'description', 'custom_fields'])
+        tickets_df = tickets_df.rename(columns={'id': 'ticket_id', 'created_at': 'created_date'})
+        tickets_df['created_date'] = tickets_df['created_date'].dt.tz_convert(None)
+        return tickets_df, len(tickets_df)
+    tickets_df = run('store_load', store_load)
+
+    def sku_extraction():
+        mentions = extract_sku_mentions(tickets_df, SkuCatalogIndex.from_catalog(catalog))
+        tickets_df['sku'] = primary_skus(mentions, tickets_df.index)
+        return None, len(mentions)
+    run('sku_extraction', sku_extraction)
+
+    def product_join():
+        df = pd.merge(tickets_df.drop(columns=['subject', 'custom_fields']), catalog, on='sku', how='left')
+        df = df.sort_values('created_date', kind='stable').reset_index(drop=True)
+        return df, len(df)
+    df = run('product_join', product_join)
+
+    def tokenization():
+        term_index = build_term_index(df['description'], stop_words)
+        return term_index, term_index.matrix.shape[0]
+    term_index = run('tokenization', tokenization)
+
+    def topic_classification():
+        df['topic'] = TopicClassifier().classify(df['description'])
+        return None, len(df)
+    run('topic_classification', topic_classification)
+
+    def cube_build():
+        cube = ticket_cube.build_ticket_cube(df)
+        return (cube, ticket_cube.build_topic_rollup(cube)), len(cube)
+    cube, rollup = run('cube_build', cube_build)
+
+    def filter_index_build():
+        return TicketFilterIndex(df), len(df)
+    filter_index = run('filter_index_build', filter_index_build)
+
+    states = _sidebar_states(filter_index, SIDEBAR_STATES_PER_RUN, seed=seed)
+
+    def sidebar_filtering():
+        selected = sum(len(filter_index.page_selection(*state, topic=_page_topic(state[3]))) for state in states)
+        return None, selected
+    run('sidebar_filtering', sidebar_filtering)
+    run('sidebar_filtering_cached', sidebar_filtering)
+
+    def overall_dashboard():
+        cells = 0
+        for start_date, end_date, brand, _ in states:
+            rollup_selection = ticket_cube.slice_cube(rollup, start_date, end_date, brand)
+            ticket_cube.topic_rates(rollup_selection, ['Defect', 'Return', 'Question'])
+            ticket_cube.monthly_topic_trend(rollup_selection, ['Defect', 'Return'])
+            cells += len(rollup_selection)
+        return None, cells
+    run('page_overall_dashboard', overall_dashboard)
+
+    def product_deep_dive():
+        selected = 0
+        for start_date, end_date, brand, _ in states:
+            cube_selection = ticket_cube.slice_cube(cube, start_date, end_date, brand)
+            products = ticket_cube.products_in(cube_selection)
+            if not products:
+                continue
+            product_cells = ticket_cube.product_cells(cube_selection, products[0])
+            ticket_cube.topic_rates(product_cells, ['Defect', 'Return'])
+            page_rows = filter_index.page_selection(start_date, end_date, brand, "Product Deep Dive")
+            product_rows = filter_index.restrict(page_rows, 'product_name', products[0])
+            problem_rows = filter_index.restrict(product_rows, 'topic', ['Defect', 'Return'])
+            term_index.top_terms(problem_rows, 5)
+            selected += len(product_rows)
+        return None, selected
+    run('page_product_deep_dive', product_deep_dive)
+
+    def topic_pages():
+        selected = 0
+        for start_date, end_date, brand, _ in states:
+            rollup_selection = ticket_cube.slice_cube(rollup, start_date, end_date, brand)
+            cube_selection = ticket_cube.slice_cube(cube, start_date, end_date, brand)
+            for topic in ['Return', 'Defect', 'Question']:
+                ticket_cube.topic_rates(rollup_selection, [topic])
+                ticket_cube.top_products(cube_selection, topic, 5)
+                topic_rows = filter_index.page_selection(start_date, end_date, brand, f"{topic} Analysis", topic=topic)
+                term_index.top_terms(topic_rows, 10)
+                selected += len(topic_rows)
+        return None, selected
+    run('page_topic_analysis', topic_pages)
+
+
+def compare_results(current, baseline, tolerance=0.2):
+    """
+    Lists stages that got slower than the baseline run by more than tolerance
+    (a fraction) at the same ticket count.
+    """
+    previous = {(row['tickets'], row['stage']): row for row in baseline['results']}
+    regressions = []
+    for row in current['results']:
+        before = previous.get((row['tickets'], row['stage']))
+        if before and before['seconds'] > 0 and row['seconds'] > before['seconds'] * (1 + tolerance):
+            regressions.append({**row, 'baseline_seconds': before['seconds'], 'ratio': row['seconds'] / before['seconds']})
+    return regressions
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, workers=1, track_memory=True, seed=0):
+    results = []
+    print(f"{'tickets':>10} | {'stage':<24} | {'time':>9} | {'python MB':>9} | {'arrow MB':>9} | {'+RSS MB':>9} | {'child MB':>9} | rows")
+    with tempfile.TemporaryDirectory(prefix='zendesk_benchmark_') as workdir:
+        for n_tickets in sizes:
+            benchmark_pipeline(n_tickets, workdir, results, workers=workers, track_memory=track_memory, seed=seed)
+    return {
+        'git_commit': _git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'cpu_count': os.cpu_count(),
+        'workers': workers,
+        'tracemalloc': track_memory,
+        'results': results,
+    }
+
+
+# --- MAIN EXECUTION ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and memory-profile every stage of the ticket pipeline.")
+    parser.add_argument('--tickets', type=int, nargs='+', default=DEFAULT_SIZES, help="ticket counts to benchmark, e.g. 10000 1000000")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes for the ingestion stage")
+    parser.add_argument('--no-memory', action='store_true', help="skip tracemalloc to time stages without tracing overhead; Arrow and RSS figures are still recorded")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help="earlier results file to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slowdown before a stage counts as a regression")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.tickets, workers=args.workers, track_memory=not args.no_memory)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results saved to '{args.output}'.")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('tracemalloc') != report['tracemalloc']:
+            # tracemalloc slows Python-heavy stages several times over
+            print("⚠️ Only one of the two runs used tracemalloc, so timings are not comparable; use --no-memory for both or neither.")
+        regressions = compare_results(report, baseline, args.tolerance)
+        for row in regressions:
+            print(f"⚠️ {row['stage']} at {row['tickets']} tickets: {row['seconds']:.3f}s vs {row['baseline_seconds']:.3f}s ({row['ratio']:.2f}x)")
+        if regressions:
+            raise SystemExit(1)
+        print("No regressions found.")
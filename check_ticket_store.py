@@ -0,0 +1,125 @@
+import pandas as pd
+import os
+import tempfile
+
+from data_profiler import stream_zendesk_jsonl
+from synthetic_data import generate_product_catalog, write_zendesk_export
+from ticket_store import MAX_FILES_PER_PARTITION, _part_files, _partition_months, load_tickets, store_version, upsert_tickets
+
+
+def _tickets(ids, updated_at, description='original', created_at='2024-03-05T10:00:00Z'):
+    return pd.DataFrame({
+        'id': list(ids),
+        'created_at': created_at,
+        'updated_at': updated_at,
+        'description': description,
+        'status': 'open',
+    })
+
+
+def _store_files(store_dir):
+    return sorted(path for month in _partition_months(store_dir) for path in _part_files(store_dir, month))
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def check_reingest_is_noop(store_dir):
+    first = upsert_tickets(store_dir, _tickets(range(1, 101), '2024-03-06T00:00:00Z'))
+    files = _store_files(store_dir)
+    before = load_tickets(store_dir)
+    again = upsert_tickets(store_dir, _tickets(range(1, 101), '2024-03-06T00:00:00Z'))
+    check(first == 100, f"expected 100 new tickets, wrote {first}")
+    check(again == 0, f"re-ingesting unchanged tickets wrote {again} rows")
+    check(_store_files(store_dir) == files, "re-ingesting unchanged tickets added part files")
+    pd.testing.assert_frame_equal(load_tickets(store_dir), before)
+
+
+def check_newer_version_wins(store_dir):
+    upsert_tickets(store_dir, _tickets(range(1, 11), '2024-03-06T00:00:00Z'))
+    written = upsert_tickets(store_dir, _tickets([3, 4], '2024-03-09T00:00:00Z', description='updated'))
+    stale = upsert_tickets(store_dir, _tickets([5], '2024-03-01T00:00:00Z', description='stale'))
+    df = load_tickets(store_dir).set_index('id')
+    check(written == 2, f"expected 2 updated tickets, wrote {written}")
+    check(stale == 0, "an older version of a ticket was written")
+    check(len(df) == 10, f"expected 10 tickets after updates, loaded {len(df)}")
+    check((df.loc[[3, 4], 'description'] == 'updated').all(), "newer versions did not replace older ones")
+    check(df.loc[5, 'description'] == 'original', "an older version replaced a newer one")
+
+
+def check_versions_within_one_run(store_dir):
+    chunks = [
+        _tickets([1, 2], '2024-03-06T00:00:00Z'),
+        _tickets([1], '2024-03-08T00:00:00Z', description='second'),
+        _tickets([2], '2024-03-07T00:00:00Z', description='second'),
+        _tickets([1], '2024-03-07T00:00:00Z', description='stale'),
+    ]
+    upsert_tickets(store_dir, iter(chunks))
+    df = load_tickets(store_dir).set_index('id')
+    check(list(df['description']) == ['second', 'second'], f"latest versions not resolved: {df['description'].tolist()}")
+
+
+def check_compaction_keeps_latest(store_dir):
+    for version in range(MAX_FILES_PER_PARTITION + 2):
+        upsert_tickets(store_dir, _tickets(range(1, 6), f"2024-03-{10 + version:02d}T00:00:00Z", description=f"v{version}"))
+    df = load_tickets(store_dir)
+    check(len(_store_files(store_dir)) <= MAX_FILES_PER_PARTITION, "partition was not compacted")
+    check(len(df) == 5 and (df['description'] == f"v{MAX_FILES_PER_PARTITION + 1}").all(), "compaction lost the latest versions")
+
+
+def check_streaming_reingest_is_noop(store_dir):
+    export_path = os.path.join(os.path.dirname(store_dir), 'export.jsonl')
+    write_zendesk_export(export_path, 5000, generate_product_catalog(20))
+    first = stream_zendesk_jsonl(export_path, store_dir, chunk_size=700, workers=2)
+    files = _store_files(store_dir)
+    again = stream_zendesk_jsonl(export_path, store_dir, chunk_size=700, workers=2)
+    check(first['written'] == 5000, f"expected 5000 tickets, wrote {first['written']}")
+    check(again['written'] == 0, f"re-ingesting the export wrote {again['written']} rows")
+    check(_store_files(store_dir) == files, "re-ingesting the export added part files")
+    check(load_tickets(store_dir, columns=['id'])['id'].is_unique, "duplicate tickets after re-ingesting")
+
+
+def check_empty_store_is_typed(store_dir):
+    df = load_tickets(store_dir, columns=['id', 'created_at', 'description'])
+    check(df.empty, "expected an empty load")
+    check(str(df['created_at'].dtype) == 'datetime64[ns, UTC]', f"created_at has dtype {df['created_at'].dtype}")
+
+
+def check_store_version_tracks_upserts(store_dir):
+    check(store_version(store_dir) is None, "a missing store should have no version")
+    upsert_tickets(store_dir, _tickets(range(1, 11), '2024-03-06T00:00:00Z'))
+    first = store_version(store_dir)
+    upsert_tickets(store_dir, _tickets(range(1, 11), '2024-03-06T00:00:00Z'))
+    check(store_version(store_dir) == first, "a no-op re-ingest changed the store version")
+    upsert_tickets(store_dir, _tickets([5], '2024-03-07T00:00:00Z', description='updated'))
+    check(store_version(store_dir) != first, "an update did not change the store version")
+    upsert_tickets(store_dir, _tickets([11], '2024-04-02T00:00:00Z', created_at='2024-04-01T10:00:00Z'))
+    check(store_version(store_dir)[0] == 2, "a new month partition is not part of the store version")
+
+
+CHECKS = [
+    check_reingest_is_noop,
+    check_newer_version_wins,
+    check_versions_within_one_run,
+    check_compaction_keeps_latest,
+    check_streaming_reingest_is_noop,
+    check_empty_store_is_typed,
+    check_store_version_tracks_upserts,
+]
+
+
+# --- MAIN EXECUTION ---
+if __name__ == "__main__":
+    failed = 0
+    for check_fn in CHECKS:
+        with tempfile.TemporaryDirectory(prefix='zendesk_store_check_') as workdir:
+            try:
+                check_fn(os.path.join(workdir, 'store'))
+                print(f"✅ {check_fn.__name__}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {check_fn.__name__}: {e}")
+    if failed:
+        raise SystemExit(1)
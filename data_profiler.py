@@ -1,5 +1,22 @@
 import pandas as pd
 import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from perf_instrumentation import recorder
+from profile_stats import ProfileAccumulator
+from ticket_store import DEFAULT_STORE_DIR, prepare_tickets, upsert_tickets
+
+# Common key names for ticket lists in Zendesk exports
+TICKET_LIST_KEYS = ['results', 'tickets', 'exports', 'audits']
+
+# Number of tickets flattened and written to disk at a time in streaming mode
+DEFAULT_CHUNK_SIZE = 10000
+
+# Worker processes used to ingest JSON Lines exports in parallel
+INGESTION_WORKERS = os.cpu_count() or 1
 
 def profile_nested_zendesk_data(json_file_path):
     """
@@ -7,10 +24,12 @@ def profile_nested_zendesk_data(json_file_path):
     analyzes its structure, and saves a complete report.
     """
     print(f"--- Loading complex JSON from '{json_file_path}' ---")
+    recorder.start_run()
     
     try:
-        with open(json_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with recorder.stage('json_load'):
+            with open(json_file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
 
         tickets_list = None
         
@@ -22,11 +41,8 @@ def profile_nested_zendesk_data(json_file_path):
             # The file is a dictionary. We need to find the list of tickets inside it.
             print(f"Found top-level keys in the JSON object: {list(data.keys())}")
             
-            # Common key names for ticket lists in Zendesk exports
-            possible_keys = ['results', 'tickets', 'exports', 'audits']
-            
             # First, check for common key names
-            for key in possible_keys:
+            for key in TICKET_LIST_KEYS:
                 if key in data and isinstance(data[key], list):
                     print(f"Found list of tickets under the common key: '{key}'")
                     tickets_list = data[key]
@@ -47,52 +63,219 @@ def profile_nested_zendesk_data(json_file_path):
             return
         
         # Once the list is found, the rest of the process is the same.
-        df = pd.json_normalize(tickets_list)
+        with recorder.stage('normalize', rows=len(tickets_list)):
+            df = pd.json_normalize(tickets_list)
         
-        # --- The rest of the report generation remains the same ---
-        print("\n" + "="*50)
-        print("DATA PROFILING REPORT")
-        print("="*50)
-        print("\n--- 1. Basic Information ---")
-        print(f"Total number of tickets found: {len(df)}")
-        print(f"Total number of columns (fields) found: {len(df.columns)}")
-        print("\n--- 2. Column Names & Data Types ---")
-        with pd.option_context('display.max_rows', None):
-            df.info(verbose=True, show_counts=True)
-        print("\n--- 3. Missing Data Report ---")
-        missing_values = df.isnull().sum()
-        missing_values_filtered = missing_values[missing_values > 0].sort_values(ascending=False)
-        if not missing_values_filtered.empty:
-            print(missing_values_filtered)
-        else:
-            print("No missing data found.")
-        print("\n--- 4. Analysis of Key Fields ---")
-        key_columns = {'status': 'Status', 'via.channel': 'Channel', 'priority': 'Priority'}
-        for col, title in key_columns.items():
-            if col in df.columns:
-                print(f"\n--- Top 5 Values for '{title}' ---")
-                print(df[col].value_counts().head(5))
-            else:
-                print(f"\n--- Column '{col}' not found. Skipping analysis. ---")
-        if 'created_at' in df.columns:
-            print("\n--- 5. Date Range of Tickets ---")
-            df['created_at'] = pd.to_datetime(df['created_at'])
-            print(f"Earliest Ticket: {df['created_at'].min()}")
-            print(f"Latest Ticket:   {df['created_at'].max()}")
+        # --- The report is built by the same single-pass engine as the streaming mode ---
+        with recorder.stage('profile', rows=len(df)):
+            profile = ProfileAccumulator()
+            profile.update(df)
+        profile.print_report()
         
-        output_csv_path = 'zendesk_data_organized_full.csv'
         print("\n" + "="*50)
-        print(f"Saving the complete organized dataset to '{output_csv_path}'...")
-        df.to_csv(output_csv_path, index=False)
-        print(f"✅ SUCCESS: The full dataset with {len(df)} rows has been saved.")
+        print(f"Saving the organized dataset to the ticket store '{DEFAULT_STORE_DIR}'...")
+        with recorder.stage('store_upsert') as stage:
+            written = upsert_tickets(DEFAULT_STORE_DIR, df)
+            stage['rows'] = written
+        print(f"✅ SUCCESS: {written} new or updated tickets out of {len(df)} have been saved.")
         print("="*50)
+        print_stage_timings()
 
     except FileNotFoundError:
         print(f"Error: The file '{json_file_path}' was not found.")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
+# --- STREAMING (JSON LINES) INGESTION ---
+def iter_jsonl_tickets(jsonl_file_path, stats, start=0, end=None):
+    """
+    Yields ticket dicts from a JSON Lines file one line at a time, so the file is
+    never loaded as a whole. Lines that are not valid JSON (URLs, headers, blank
+    lines) are skipped and counted in stats['skipped_lines'].
+    Only lines starting inside the byte range [start, end) are read.
+    """
+    with open(jsonl_file_path, 'rb') as f:
+        f.seek(start)
+        position = start
+        for line in f:
+            if end is not None and position >= end:
+                break
+            position += len(line)
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                stats['skipped_lines'] += 1
+                continue
+            # A line can hold a single ticket or a page of tickets (e.g. {"tickets": [...]})
+            if isinstance(record, dict):
+                tickets = next((record[key] for key in TICKET_LIST_KEYS if isinstance(record.get(key), list)), [record])
+            elif isinstance(record, list):
+                tickets = record
+            else:
+                stats['skipped_lines'] += 1
+                continue
+            for ticket in tickets:
+                if isinstance(ticket, dict):
+                    yield ticket
+
+
+def write_ticket_chunk(chunk_df, parts_dir, part_name):
+    """
+    Writes one normalized chunk of tickets to its own part file, already converted
+    to the ticket store layout. Returns the part file path.
+    """
+    part_path = os.path.join(parts_dir, f"{part_name}.parquet")
+    prepare_tickets(chunk_df).to_parquet(part_path, index=False)
+    return part_path
+
+
+def store_ticket_chunks(part_paths, store_dir):
+    """
+    Upserts part files into the ticket store in order. Parts are read back one at
+    a time, so memory stays bounded by the chunk size.
+    """
+    return upsert_tickets(store_dir, (pd.read_parquet(part_path) for part_path in part_paths))
+
+
+def find_shard_ranges(jsonl_file_path, num_shards):
+    """
+    Splits a JSON Lines file into at most num_shards byte ranges. Every boundary is
+    moved forward to the start of the next line, so no line is split across shards.
+    """
+    file_size = os.path.getsize(jsonl_file_path)
+    offsets = [0]
+    with open(jsonl_file_path, 'rb') as f:
+        for i in range(1, num_shards):
+            f.seek(file_size * i // num_shards)
+            f.readline()
+            offset = f.tell()
+            if offsets[-1] < offset < file_size:
+                offsets.append(offset)
+    offsets.append(file_size)
+    return list(zip(offsets[:-1], offsets[1:]))
+
+
+def ingest_shard(jsonl_file_path, start, end, parts_dir, shard_number, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Parses and normalizes the lines of one byte range in fixed-size chunks.
+    Runs inside a worker process, so it only returns part file paths, counters and
+    the shard's profiling accumulator.
+    """
+    stats = {'tickets': 0, 'skipped_lines': 0, 'part_paths': [], 'profile': ProfileAccumulator()}
+
+    def flush(chunk):
+        chunk_df = pd.json_normalize(chunk)
+        stats['profile'].update(chunk_df)
+        part_name = f"shard-{shard_number:03d}-part-{len(stats['part_paths']):05d}"
+        stats['part_paths'].append(write_ticket_chunk(chunk_df, parts_dir, part_name))
+        stats['tickets'] += len(chunk)
+
+    chunk = []
+    for ticket in iter_jsonl_tickets(jsonl_file_path, stats, start=start, end=end):
+        chunk.append(ticket)
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+    return stats
+
+
+def stream_zendesk_jsonl(jsonl_file_path, store_dir=DEFAULT_STORE_DIR, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    """
+    Ingests a JSON Lines export in fixed-size chunks. Each chunk is normalized and
+    written to disk as soon as it is full, so peak memory depends on chunk_size
+    and not on the size of the file.
+    With workers > 1 the file is split into newline-aligned byte ranges that are
+    ingested by separate processes. Shards are upserted into the ticket store in
+    file order, so the result is the same as a single-worker run.
+    """
+    shard_ranges = find_shard_ranges(jsonl_file_path, max(1, workers))
+    os.makedirs(store_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=store_dir, prefix='zendesk_parts_') as parts_dir:
+        with recorder.stage('shard_ingestion') as stage:
+            if len(shard_ranges) == 1:
+                shard_results = [ingest_shard(jsonl_file_path, *shard_ranges[0], parts_dir, 0, chunk_size)]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [
+                        executor.submit(ingest_shard, jsonl_file_path, start, end, parts_dir, i, chunk_size)
+                        for i, (start, end) in enumerate(shard_ranges)
+                    ]
+                    shard_results = [future.result() for future in futures]
+            stage['rows'] = sum(result['tickets'] for result in shard_results)
+
+        stats = {'tickets': 0, 'skipped_lines': 0, 'shards': len(shard_ranges), 'profile': ProfileAccumulator()}
+        part_paths = []
+        for result in shard_results:
+            stats['profile'].merge(result['profile'])
+            stats['tickets'] += result['tickets']
+            stats['skipped_lines'] += result['skipped_lines']
+            part_paths.extend(result['part_paths'])
+        with recorder.stage('store_upsert') as stage:
+            stats['written'] = store_ticket_chunks(part_paths, store_dir)
+            stage['rows'] = stats['written']
+    return stats
+
+
+def print_stage_timings():
+    """
+    Prints wall time, rows and resident and Arrow memory growth of every stage of the current run.
+    """
+    records = recorder.to_frame()
+    records = records[records['run'] == recorder.current_run]
+    print("\n--- Stage Timings ---")
+    print(records[['stage', 'seconds', 'rows', 'rss_growth_mb', 'arrow_growth_mb', 'process_peak_rss_mb']].to_string(index=False))
+
+
+def benchmark_ingestion(jsonl_file_path, max_workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Runs the streaming ingestion with 1 to max_workers processes and reports the
+    throughput of each run in tickets per second.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    results = []
+    print(f"--- Ingestion throughput for '{jsonl_file_path}' ---")
+    with tempfile.TemporaryDirectory(prefix='zendesk_benchmark_') as output_dir:
+        for workers in range(1, max_workers + 1):
+            # Every run gets an empty store, otherwise later runs would have nothing to upsert
+            store_dir = os.path.join(output_dir, f"store-{workers}")
+            started = time.perf_counter()
+            stats = stream_zendesk_jsonl(jsonl_file_path, store_dir, chunk_size=chunk_size, workers=workers)
+            elapsed = time.perf_counter() - started
+            tickets_per_sec = stats['tickets'] / elapsed if elapsed > 0 else 0.0
+            results.append({'workers': workers, 'tickets': stats['tickets'], 'seconds': elapsed, 'tickets_per_sec': tickets_per_sec})
+            print(f"{workers:>3} worker(s): {stats['tickets']} tickets in {elapsed:.2f}s -> {tickets_per_sec:,.0f} tickets/sec")
+    return results
+
+
+def profile_zendesk_jsonl_streaming(jsonl_file_path, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    """
+    Streaming counterpart of profile_nested_zendesk_data for very large JSON Lines
+    exports that may contain non-JSON lines.
+    """
+    print(f"--- Streaming JSON Lines from '{jsonl_file_path}' in chunks of {chunk_size} tickets using {workers} worker(s) ---")
+    recorder.start_run()
+    try:
+        stats = stream_zendesk_jsonl(jsonl_file_path, DEFAULT_STORE_DIR, chunk_size=chunk_size, workers=workers)
+        stats['profile'].print_report()
+        print(f"\nNon-JSON lines skipped: {stats['skipped_lines']}")
+        print("\n" + "="*50)
+        print(f"✅ SUCCESS: {stats['written']} new or updated tickets out of {stats['tickets']} have been saved to '{DEFAULT_STORE_DIR}'.")
+        print("="*50)
+        print_stage_timings()
+    except FileNotFoundError:
+        print(f"Error: The file '{jsonl_file_path}' was not found.")
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+
 # --- MAIN EXECUTION ---
 if __name__ == "__main__":
     ZENDESK_JSON_FILE = "your_data_file.json" 
-    profile_nested_zendesk_data(ZENDESK_JSON_FILE)
+    if ZENDESK_JSON_FILE.endswith('.jsonl'):
+        profile_zendesk_jsonl_streaming(ZENDESK_JSON_FILE, workers=INGESTION_WORKERS)
+    else:
+        profile_nested_zendesk_data(ZENDESK_JSON_FILE)
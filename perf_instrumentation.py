@@ -0,0 +1,213 @@
+import pandas as pd
+import io
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pyarrow as pa
+
+try:
+    import resource
+except ImportError:  # Windows has no getrusage
+    resource = None
+
+# Number of stage records kept in memory; older ones are dropped first
+MAX_STAGE_RECORDS = 5000
+
+# ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+_RSS_UNIT_MB = 1e-6 if sys.platform == 'darwin' else 1e-3
+
+# Resident page count of the current process, on Linux
+_STATM_FILE = '/proc/self/statm'
+
+RECORD_COLUMNS = [
+    'run', 'stage', 'seconds', 'rows', 'rss_mb', 'rss_growth_mb', 'arrow_mb', 'arrow_growth_mb',
+    'process_peak_rss_mb', 'cache', 'started',
+]
+
+
+def peak_rss_mb(children=False):
+    """
+    Peak resident memory of the process so far (or, with children, of its
+    largest finished child process), or None where getrusage is unavailable.
+    Reading it costs a single system call.
+    """
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    return resource.getrusage(who).ru_maxrss * _RSS_UNIT_MB
+
+
+def current_rss_mb():
+    """
+    Resident memory of the process right now, or None where /proc is not
+    available. Unlike the peak it can go down, so before/after readings show
+    what a stage kept allocated.
+    """
+    try:
+        with open(_STATM_FILE) as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') * 1e-6
+
+
+def arrow_allocated_mb():
+    # Bytes currently held by Arrow's default memory pool (parquet reads, compute kernels)
+    return pa.total_allocated_bytes() * 1e-6
+
+
+def _growth(before, after):
+    return None if before is None or after is None else after - before
+
+
+class PerfRecorder:
+    """
+    Collects wall time, row counts and memory per named stage, plus call and
+    miss counts for cached functions. Memory is recorded as the resident and
+    Arrow memory at the end of a stage and their change over it; both are
+    process-wide, so stages running at the same time in other sessions show
+    up in each other's changes. process_peak_rss_mb is the process's lifetime
+    high-water mark, not a peak of the stage. Records are kept in a bounded
+    deque and grouped by run, one run per dashboard rerun or ingestion job.
+    Timing a stage adds a perf_counter, a /proc read and a getrusage call, so
+    it can stay on in production.
+    """
+
+    def __init__(self, max_records=MAX_STAGE_RECORDS):
+        self.records = deque(maxlen=max_records)
+        self.cache_calls = {}
+        self.cache_misses = {}
+        self._runs = itertools.count(1)
+        self._lock = threading.Lock()
+        # Streamlit runs every rerun on its own thread, so the current run and
+        # the cache miss flag are tracked per thread
+        self._local = threading.local()
+
+    def start_run(self):
+        self._local.run = next(self._runs)
+        return self._local.run
+
+    @property
+    def current_run(self):
+        return getattr(self._local, 'run', None)
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Times the enclosed block. The yielded dict can be updated with the
+        number of rows the stage produced: `info['rows'] = len(result)`.
+        """
+        info = {'rows': rows, 'cache': None}
+        rss_before, arrow_before = current_rss_mb(), arrow_allocated_mb()
+        started = time.perf_counter()
+        try:
+            yield info
+        finally:
+            seconds = time.perf_counter() - started
+            rss_after, arrow_after = current_rss_mb(), arrow_allocated_mb()
+            self._add({
+                'run': self.current_run,
+                'stage': name,
+                'seconds': seconds,
+                'rows': info['rows'],
+                'rss_mb': rss_after,
+                'rss_growth_mb': _growth(rss_before, rss_after),
+                'arrow_mb': arrow_after,
+                'arrow_growth_mb': arrow_after - arrow_before,
+                'process_peak_rss_mb': peak_rss_mb(),
+                'cache': info['cache'],
+                'started': pd.Timestamp.now().isoformat(timespec='milliseconds'),
+            })
+
+    def _add(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    def cache_miss(self, name):
+        """
+        Called from inside the body of a cached function, which only runs when
+        the cache has no entry for the arguments.
+        """
+        with self._lock:
+            self.cache_misses[name] = self.cache_misses.get(name, 0) + 1
+        self._local.missed = True
+
+    def cached_call(self, name, fn, *args, rows=None, **kwargs):
+        """
+        Calls a st.cache_data / st.cache_resource function as a timed stage and
+        counts it as a hit unless its body reported a miss. rows, if given, is a
+        function of the result.
+        """
+        self._local.missed = False
+        with self.stage(name) as info:
+            result = fn(*args, **kwargs)
+            info['cache'] = 'miss' if self._local.missed else 'hit'
+            if rows is not None:
+                info['rows'] = rows(result)
+        with self._lock:
+            self.cache_calls[name] = self.cache_calls.get(name, 0) + 1
+        return result
+
+    def to_frame(self):
+        with self._lock:
+            records = list(self.records)
+        return pd.DataFrame(records, columns=RECORD_COLUMNS)
+
+    def stage_summary(self):
+        """
+        Count, mean, p95 and max wall time plus the largest row count per stage.
+        """
+        frame = self.to_frame()
+        if frame.empty:
+            return pd.DataFrame(columns=['stage', 'calls', 'mean_seconds', 'p95_seconds', 'max_seconds', 'max_rows'])
+        grouped = frame.groupby('stage', sort=False)
+        summary = pd.DataFrame({
+            'calls': grouped.size(),
+            'mean_seconds': grouped['seconds'].mean(),
+            'p95_seconds': grouped['seconds'].quantile(0.95),
+            'max_seconds': grouped['seconds'].max(),
+            'max_rows': grouped['rows'].max(),
+        })
+        return summary.sort_values('mean_seconds', ascending=False).reset_index()
+
+    def cache_summary(self):
+        with self._lock:
+            calls = dict(self.cache_calls)
+            misses = dict(self.cache_misses)
+        rows = []
+        for name in sorted(set(calls) | set(misses)):
+            n_calls, n_misses = calls.get(name, 0), misses.get(name, 0)
+            # A miss outside cached_call (e.g. a direct call) still counts as a call
+            n_calls = max(n_calls, n_misses)
+            rows.append({
+                'function': name, 'calls': n_calls, 'hits': n_calls - n_misses, 'misses': n_misses,
+                'hit_rate': (n_calls - n_misses) / n_calls if n_calls else 0.0,
+            })
+        return pd.DataFrame(rows, columns=['function', 'calls', 'hits', 'misses', 'hit_rate'])
+
+    def to_json(self):
+        return json.dumps({
+            'stages': self.to_frame().to_dict(orient='records'),
+            'caches': self.cache_summary().to_dict(orient='records'),
+        }, indent=2, default=str)
+
+    def to_csv(self):
+        buffer = io.StringIO()
+        self.to_frame().to_csv(buffer, index=False)
+        return buffer.getvalue()
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+            self.cache_calls.clear()
+            self.cache_misses.clear()
+
+
+# Process-wide recorder shared by the dashboard and the ingestion scripts
+recorder = PerfRecorder()
@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+from collections import Counter
+
+# HyperLogLog precision: 2**12 registers per column, about 1.6% standard error
+HLL_PRECISION = 12
+
+# Counters kept per key column; values with fewer distinct entries are counted exactly
+TOP_K_CAPACITY = 100
+
+# Columns analysed in section 4 of the report, with their display titles
+KEY_COLUMNS = {'status': 'Status', 'via.channel': 'Channel', 'priority': 'Priority'}
+
+# Columns whose date range is reported in section 5
+DATE_COLUMNS = ['created_at']
+
+
+def _normalize_values(values):
+    # Integral floats (int columns that had nulls in a chunk) are treated as ints,
+    # so the same value hashes and infers identically in every chunk
+    if pd.api.types.is_float_dtype(values) and len(values) and (values == np.floor(values)).all():
+        return values.astype('int64')
+    return values
+
+
+def _hash_values(values):
+    try:
+        return pd.util.hash_pandas_object(values, index=False).to_numpy()
+    except TypeError:
+        # Lists and dicts left over by json_normalize are not hashable
+        return pd.util.hash_pandas_object(values.astype(str), index=False).to_numpy()
+
+
+class DistinctCounter:
+    """
+    HyperLogLog sketch for approximate distinct counts. Sketches built on
+    different chunks or workers merge by taking the register-wise maximum.
+    """
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values):
+        if len(values) == 0:
+            return
+        hashes = _hash_values(values)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        remaining = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        # Rank = position of the lowest set bit; isolating it gives an exact power of two
+        lowest_bit = remaining & (~remaining + np.uint64(1))
+        ranks = np.full(len(hashes), 64 - self.precision + 1, dtype=np.uint8)
+        nonzero = lowest_bit > 0
+        ranks[nonzero] = np.log2(lowest_bit[nonzero].astype(np.float64)).astype(np.uint8) + 1
+        np.maximum.at(self.registers, index, ranks)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        empty = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * m and empty:
+            # Linear counting is more accurate for small cardinalities
+            return int(round(m * np.log(m / empty)))
+        return int(round(raw))
+
+
+class HeavyHitters:
+    """
+    Misra-Gries summary of the most frequent values of a column. Counts are exact
+    while a column has at most `capacity` distinct values and never overestimate
+    otherwise. Summaries merge by adding counters and pruning again.
+    """
+
+    def __init__(self, capacity=TOP_K_CAPACITY):
+        self.capacity = capacity
+        self.counts = Counter()
+
+    def update(self, values):
+        self.counts.update(values.value_counts().to_dict())
+        self._prune()
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self._prune()
+
+    def _prune(self):
+        if len(self.counts) <= self.capacity:
+            return
+        threshold = sorted(self.counts.values(), reverse=True)[self.capacity]
+        self.counts = Counter({value: count - threshold for value, count in self.counts.items() if count > threshold})
+
+    def top(self, n=5):
+        return self.counts.most_common(n)
+
+
+class ColumnProfile:
+    """
+    Per-column accumulator: non-null count, inferred value kinds and distinct count.
+    Null counts are derived from the total row count, so columns that are missing
+    from some chunks are still reported correctly.
+    """
+
+    def __init__(self):
+        self.non_null = 0
+        self.kinds = Counter()
+        self.distinct = DistinctCounter()
+
+    def update(self, series):
+        values = _normalize_values(series.dropna())
+        if values.empty:
+            return
+        self.non_null += len(values)
+        self.kinds[pd.api.types.infer_dtype(values, skipna=True)] += len(values)
+        self.distinct.update(values)
+
+    def merge(self, other):
+        self.non_null += other.non_null
+        self.kinds.update(other.kinds)
+        self.distinct.merge(other.distinct)
+
+    def dtype(self):
+        if not self.kinds:
+            return 'empty'
+        if len(self.kinds) == 1:
+            return next(iter(self.kinds))
+        return 'mixed(' + ', '.join(kind for kind, _ in self.kinds.most_common()) + ')'
+
+
+class ProfileAccumulator:
+    """
+    Builds the data profiling report in a single pass over chunks of tickets.
+    Call update() for every normalized chunk, merge() to combine accumulators from
+    other chunks or worker processes, and print_report() once at the end.
+    """
+
+    def __init__(self, key_columns=None, date_columns=None):
+        self.key_columns = dict(KEY_COLUMNS if key_columns is None else key_columns)
+        self.date_columns = list(DATE_COLUMNS if date_columns is None else date_columns)
+        self.rows = 0
+        self.columns = {}
+        self.heavy_hitters = {col: HeavyHitters() for col in self.key_columns}
+        self.date_ranges = {}
+
+    def update(self, df):
+        self.rows += len(df)
+        for col in df.columns:
+            self.columns.setdefault(col, ColumnProfile()).update(df[col])
+        for col, hitters in self.heavy_hitters.items():
+            if col in df.columns:
+                hitters.update(df[col].dropna())
+        for col in self.date_columns:
+            if col in df.columns:
+                dates = pd.to_datetime(df[col], errors='coerce', utc=True).dropna()
+                if not dates.empty:
+                    self._update_date_range(col, dates.min(), dates.max())
+
+    def merge(self, other):
+        self.rows += other.rows
+        for col, profile in other.columns.items():
+            if col in self.columns:
+                self.columns[col].merge(profile)
+            else:
+                self.columns[col] = profile
+        for col, hitters in other.heavy_hitters.items():
+            self.heavy_hitters.setdefault(col, HeavyHitters()).merge(hitters)
+        for col, (earliest, latest) in other.date_ranges.items():
+            self._update_date_range(col, earliest, latest)
+
+    def _update_date_range(self, col, earliest, latest):
+        if col in self.date_ranges:
+            current_earliest, current_latest = self.date_ranges[col]
+            earliest, latest = min(earliest, current_earliest), max(latest, current_latest)
+        self.date_ranges[col] = (earliest, latest)
+
+    def missing_values(self):
+        missing = pd.Series({col: self.rows - profile.non_null for col, profile in self.columns.items()}, dtype='int64')
+        return missing[missing > 0].sort_values(ascending=False)
+
+    def print_report(self):
+        print("\n" + "="*50)
+        print("DATA PROFILING REPORT")
+        print("="*50)
+        print("\n--- 1. Basic Information ---")
+        print(f"Total number of tickets found: {self.rows}")
+        print(f"Total number of columns (fields) found: {len(self.columns)}")
+        print("\n--- 2. Column Names & Data Types ---")
+        summary = pd.DataFrame(
+            [(col, profile.non_null, profile.dtype(), profile.distinct.estimate()) for col, profile in self.columns.items()],
+            columns=['Column', 'Non-Null Count', 'Dtype', 'Approx. Distinct']
+        )
+        with pd.option_context('display.max_rows', None, 'display.width', None):
+            print(summary.to_string())
+        print("\n--- 3. Missing Data Report ---")
+        missing_values_filtered = self.missing_values()
+        if not missing_values_filtered.empty:
+            print(missing_values_filtered.to_string())
+        else:
+            print("No missing data found.")
+        print("\n--- 4. Analysis of Key Fields ---")
+        for col, title in self.key_columns.items():
+            if col in self.columns:
+                print(f"\n--- Top 5 Values for '{title}' ---")
+                top_values = self.heavy_hitters[col].top(5)
+                print(pd.Series(dict(top_values), name='count', dtype='int64').to_string())
+            else:
+                print(f"\n--- Column '{col}' not found. Skipping analysis. ---")
+        for col, (earliest, latest) in self.date_ranges.items():
+            print(f"\n--- 5. Date Range of Tickets ('{col}') ---")
+            print(f"Earliest Ticket: {earliest}")
+            print(f"Latest Ticket:   {latest}")
@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import json
+
+# A product code: 2-4 letters, an optional hyphen and 3-6 digits (e.g. AS-2801, as2801).
+# Written for RE2, which pyarrow uses, and matched against upper-cased text.
+SKU_PATTERN = r'\b[A-Z]{2,4}-?[0-9]{3,6}\b'
+
+# Ticket fields scanned for codes, most trusted first: the first code that is in
+# the catalog becomes the ticket's sku
+SKU_SOURCE_COLUMNS = ['custom_fields', 'subject', 'description']
+
+MENTION_COLUMNS = ['row', 'source', 'code', 'sku', 'alias']
+
+
+def _text_array(values):
+    if isinstance(values, pa.Array):
+        return pc.utf8_upper(values)
+    values = pd.Series(values)
+    try:
+        text = pa.array(values, type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Non-string values (e.g. custom_fields still held as lists) are scanned as their text
+        text = pa.array(values.astype(str).mask(values.isna()), type=pa.string(), from_pandas=True)
+    return pc.utf8_upper(text)
+
+
+def normalize_sku_codes(codes):
+    """
+    Brings codes to the catalog spelling: upper case, no spaces, and one hyphen
+    between the letters and the digits ("as 2801", "AS2801" -> "AS-2801").
+    """
+    codes = pc.replace_substring_regex(_text_array(codes), r'\s+', '')
+    codes = pc.replace_substring_regex(codes, r'^([A-Z]+)-?([0-9]+)$', r'\1-\2')
+    return codes.to_numpy(zero_copy_only=False)
+
+
+def find_sku_codes(values):
+    """
+    Finds every code in a column of text. Returns the row position and the
+    normalized code of each match, in row order and then text order.
+    Every row's first match is extracted in one pass; rows with more matches
+    get the found match removed and are scanned again, so the number of passes
+    is the largest number of codes in a single row.
+    """
+    text = _text_array(values)
+    counts = pc.count_substring_regex(text, SKU_PATTERN).fill_null(0).to_numpy(zero_copy_only=False)
+    rows = np.flatnonzero(counts)
+    found_rows, found_codes, found_order = [], [], []
+    remaining = text.take(pa.array(rows))
+    match_number = 0
+    while len(rows):
+        first = pc.struct_field(pc.extract_regex(remaining, f"(?P<code>{SKU_PATTERN})"), [0])
+        found_rows.append(rows)
+        found_codes.append(first)
+        found_order.append(np.full(len(rows), match_number))
+        more = counts[rows] > match_number + 1
+        # The match is replaced by a space so the text around it cannot form a new code
+        remaining = pc.replace_substring_regex(remaining.filter(pa.array(more)), SKU_PATTERN, ' ', max_replacements=1)
+        rows = rows[more]
+        match_number += 1
+    if not found_rows:
+        return np.array([], dtype=np.intp), np.array([], dtype=object)
+    rows = np.concatenate(found_rows)
+    order = np.lexsort((np.concatenate(found_order), rows))
+    return rows[order], normalize_sku_codes(pa.concat_arrays(found_codes).take(pa.array(order)))
+
+
+def load_sku_aliases(config_path):
+    """
+    Reads known misspellings from a JSON file shaped like {"SA-3012": "AS-3012", ...}.
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return dict(json.load(f))
+
+
+def _swapped_prefix(codes):
+    # "AS-3012" -> "SA-3012", the most common typo in real tickets
+    parts = pd.Series(codes, dtype=object).str.split('-', n=1, expand=True)
+    if parts.shape[1] < 2:
+        return np.array([None] * len(codes), dtype=object)
+    return (parts[0].str[::-1] + '-' + parts[1]).to_numpy(dtype=object)
+
+
+class SkuCatalogIndex:
+    """
+    Hash index from normalized codes to catalog SKUs. Besides every catalog SKU
+    it holds an alias table: explicit aliases plus, unless disabled, the
+    swapped-prefix spelling of each SKU when that spelling is not itself a
+    catalog SKU and belongs to exactly one product. Explicit aliases pointing
+    to SKUs missing from the catalog are ignored. Looking up a column of codes
+    is a single Index.get_indexer call.
+    """
+
+    def __init__(self, skus, aliases=None, swapped_prefix_aliases=True):
+        skus = pd.Series(skus, dtype=object).dropna().drop_duplicates().to_numpy(dtype=object)
+        keys = normalize_sku_codes(skus)
+        canonical = pd.Series(skus, index=keys)
+        canonical = canonical[~canonical.index.duplicated()]
+
+        alias_targets = pd.Series(dtype=object)
+        if swapped_prefix_aliases and len(canonical):
+            swapped = pd.Series(canonical.to_numpy(), index=_swapped_prefix(canonical.index.to_numpy()))
+            swapped = swapped[swapped.index.notna() & ~swapped.index.isin(canonical.index)]
+            alias_targets = swapped[~swapped.index.duplicated(keep=False)]
+        if aliases:
+            targets = canonical.reindex(normalize_sku_codes(list(aliases.values())))
+            explicit = pd.Series(targets.to_numpy(), index=normalize_sku_codes(list(aliases.keys()))).dropna()
+            explicit = explicit[~explicit.index.isin(canonical.index)]
+            alias_targets = pd.concat([explicit, alias_targets[~alias_targets.index.isin(explicit.index)]])
+            alias_targets = alias_targets[~alias_targets.index.duplicated()]
+
+        self.skus = canonical.to_numpy(dtype=object)
+        self.aliases = alias_targets
+        self.keys = pd.Index(np.concatenate([canonical.index.to_numpy(dtype=object), alias_targets.index.to_numpy(dtype=object)]))
+        self.targets = np.concatenate([self.skus, alias_targets.to_numpy(dtype=object), [None]])
+
+    @classmethod
+    def from_catalog(cls, catalog_df, alias_file=None, swapped_prefix_aliases=True):
+        aliases = load_sku_aliases(alias_file) if alias_file else None
+        return cls(catalog_df['sku'], aliases, swapped_prefix_aliases)
+
+    def lookup(self, codes):
+        """
+        Catalog SKU for each normalized code, or None for codes not in the catalog.
+        """
+        # get_indexer returns -1 for unknown codes, which selects the trailing None
+        return self.targets[self.keys.get_indexer(pd.Index(codes, dtype=object))]
+
+
+def extract_sku_mentions(df, catalog_index, columns=SKU_SOURCE_COLUMNS):
+    """
+    Long table with one row per distinct code found in a ticket: its row position
+    in df, the column it came from, the normalized code and the matching catalog
+    SKU (None when unknown), and whether the code was an alias. Mentions are ordered by source priority, then row,
+    then position in the text.
+    """
+    frames = []
+    for col in columns:
+        if col not in df.columns:
+            continue
+        rows, codes = find_sku_codes(df[col])
+        frames.append(pd.DataFrame({'row': rows, 'source': col, 'code': codes}))
+    if not frames:
+        frames.append(pd.DataFrame({'row': pd.Series(dtype=np.intp), 'source': pd.Series(dtype=object), 'code': pd.Series(dtype=object)}))
+    mentions = pd.concat(frames, ignore_index=True).drop_duplicates(['row', 'code'])
+    mentions['sku'] = catalog_index.lookup(mentions['code'].to_numpy())
+    mentions['alias'] = mentions['code'].isin(catalog_index.aliases.index)
+    return mentions[MENTION_COLUMNS].reset_index(drop=True)
+
+
+def primary_skus(mentions, index):
+    """
+    The ticket-level sku column: the first mention that is in the catalog, from
+    the most trusted source.
+    """
+    skus = np.full(len(index), None, dtype=object)
+    matched = mentions[mentions['sku'].notna()].drop_duplicates('row')
+    skus[matched['row'].to_numpy()] = matched['sku'].to_numpy()
+    return pd.Series(skus, index=index, name='sku')
+
+
+def unmatched_code_stats(mentions):
+    """
+    Codes found in tickets that are neither a catalog SKU nor an alias, with the
+    number of tickets mentioning each, most frequent first.
+    """
+    unmatched = mentions[mentions['sku'].isna()]
+    stats = unmatched.groupby('code')['row'].nunique().rename('tickets').sort_values(ascending=False, kind='stable')
+    return stats.reset_index()
+
+
+def sku_match_summary(mentions, n_tickets):
+    """
+    Ticket-level match counts plus the unmatched code table, small enough to
+    keep next to the dashboard data.
+    """
+    matched = mentions['sku'].notna()
+    return {
+        'tickets': n_tickets,
+        'tickets_with_codes': int(mentions['row'].nunique()),
+        'tickets_matched': int(mentions.loc[matched, 'row'].nunique()),
+        'tickets_with_several_skus': int((mentions[matched].groupby('row')['sku'].nunique() > 1).sum()),
+        'alias_matches': int(mentions['alias'].sum()),
+        'unmatched_codes': unmatched_code_stats(mentions),
+    }
@@ -0,0 +1,198 @@
+import numpy as np
+import pandas as pd
+import argparse
+import json
+from datetime import datetime, timedelta
+
+# Product families: (sku prefix, category, product name pattern)
+PRODUCT_FAMILIES = [
+    ('AS', 'Air Spring', '{position} Air Spring | {brand} {model}'),
+    ('SA', 'Shock Absorber', '{position} Air Strut | {brand} {model}'),
+    ('AC', 'Compressor', 'Air Suspension Compressor | {brand} {model}'),
+    ('VB', 'Valve Block', 'Valve Block | {brand} {model}'),
+]
+
+BRAND_MODELS = {
+    'Audi': ['A6 C7', 'A8 D4', 'Q7', 'Allroad'],
+    'BMW': ['X5 E70', '5 Series F07', '7 Series F01', 'X6'],
+    'Mercedes': ['S-Class W221', 'E-Class W211', 'GL X164', 'CLS'],
+    'Land Rover': ['Range Rover L322', 'Discovery 3', 'Range Rover Sport'],
+    'Porsche': ['Panamera', 'Cayenne'],
+    'Bentley': ['Continental GT', 'Flying Spur'],
+    'Volkswagen': ['Touareg', 'Phaeton'],
+}
+
+# Description templates in the style of real tickets, grouped by the topic they read as
+DESCRIPTION_TEMPLATES = {
+    'Return': [
+        "The {sku} doesn't fit my {brand}. I need to return it.",
+        "You sent the wrong {sku}. Please process a return.",
+        "{sku} arrived with scratches. I am returning this.",
+        "The {sku} is not the one I ordered. Initiating a return.",
+    ],
+    'Defect': [
+        "The {sku} for my {brand} {model} is leaking air. Poor quality.",
+        "My {sku} failed after just one week.",
+        "The {sku} arrived with a cracked housing.",
+        "{sku} is making a grinding noise.",
+        "The {sku} was dead on arrival.",
+    ],
+    'Question': [
+        "How do I install the {sku} on my {brand} {model}?",
+        "What is the warranty on the {sku}?",
+        "Is the {sku} a direct replacement for my {brand}?",
+        "The {sku} is a perfect fit. 5 stars.",
+        "Do I need new bolts for the {sku}?",
+    ],
+}
+TOPIC_WEIGHTS = {'Return': 0.15, 'Defect': 0.25, 'Question': 0.6}
+
+# Codes that look like SKUs but are not in the catalog
+UNKNOWN_CODES = ['ENG-014', 'FLT-015', 'EXH-016', 'LGT-017', 'ELEC-018', 'FUEL-019', 'ENG-020']
+
+JUNK_LINES = [
+    "https://aerosus.zendesk.com/api/v2/incremental/tickets.json?start_time={n}",
+    "# Zendesk incremental export - page {n}",
+    "--- end of page {n} ---",
+]
+
+STATUSES = ['new', 'open', 'pending', 'hold', 'solved', 'closed']
+PRIORITIES = ['low', 'normal', 'high', 'urgent', None]
+CHANNELS = ['email', 'web', 'api', 'chat', 'voice']
+SKU_FIELD_ID = 360001
+ORDER_FIELD_ID = 360002
+
+
+def generate_product_catalog(n_products, seed=0):
+    """
+    Builds a product catalog with unique SKUs shaped like the real ones
+    (e.g. AS-2801), spread over the product families and brands.
+    """
+    rng = np.random.default_rng(seed)
+    # Numbers are unique across families, so a swapped prefix never names another product
+    digits = max(4, len(str(999 + n_products)))
+    brands = list(BRAND_MODELS)
+    rows = []
+    for i in range(n_products):
+        prefix, category, name_pattern = PRODUCT_FAMILIES[i % len(PRODUCT_FAMILIES)]
+        brand = brands[rng.integers(len(brands))]
+        model = BRAND_MODELS[brand][rng.integers(len(BRAND_MODELS[brand]))]
+        number = 1000 + i
+        rows.append({
+            'sku': f"{prefix}-{number:0{digits}d}",
+            'product_name': name_pattern.format(position=rng.choice(['Front', 'Rear']), brand=brand, model=model),
+            'category': category,
+            'brand': brand,
+        })
+    return pd.DataFrame(rows, columns=['sku', 'product_name', 'category', 'brand'])
+
+
+def _swap_prefix(sku):
+    # "AS-3012" -> "SA-3012", the most common typo in real tickets
+    prefix, number = sku.split('-', 1)
+    return f"{prefix[::-1]}-{number}"
+
+
+def generate_tickets(n_tickets, catalog, seed=0, start_id=1, days=730, end_date=None,
+                     swapped_prefix_rate=0.02, unknown_code_rate=0.01, batch_size=100000):
+    """
+    Yields Zendesk-shaped ticket dicts with nested `via` and `custom_fields`, in
+    created_at order. The SKU appears in the description, sometimes with a
+    swapped prefix or as an unknown code, and in a custom field for about half
+    of the tickets. Random values are drawn per batch, so memory stays flat.
+    """
+    rng = np.random.default_rng(seed)
+    end_date = end_date or datetime.today()
+    start = end_date - timedelta(days=days)
+    span = days * 86400
+    topics = list(TOPIC_WEIGHTS)
+    skus = catalog['sku'].to_numpy()
+    brands = catalog['brand'].to_numpy()
+    categories = catalog['category'].to_numpy()
+
+    for batch_start in range(0, n_tickets, batch_size):
+        n = min(batch_size, n_tickets - batch_start)
+        # Each batch covers its own slice of the date range, keeping tickets in time order
+        span_lo = span * batch_start // n_tickets
+        span_hi = max(span * (batch_start + n) // n_tickets, span_lo + 1)
+        created_offsets = np.sort(rng.integers(span_lo, span_hi, size=n))
+        update_delays = rng.integers(0, 14 * 86400, size=n)
+        topic_choice = rng.choice(len(topics), size=n, p=list(TOPIC_WEIGHTS.values()))
+        product_choice = rng.integers(len(catalog), size=n)
+        template_choice = rng.random(n)
+        code_noise = rng.random(n)
+        has_sku_field = rng.random(n) < 0.5
+        statuses = rng.integers(len(STATUSES), size=n)
+        priorities = rng.integers(len(PRIORITIES), size=n)
+        channels = rng.integers(len(CHANNELS), size=n)
+        requesters = rng.integers(10_000_000, 15_000_000, size=n)
+
+        for j in range(n):
+            i = batch_start + j
+            product = product_choice[j]
+            sku, brand = skus[product], brands[product]
+            model = BRAND_MODELS.get(brand, [''])[0]
+            if code_noise[j] < unknown_code_rate:
+                mentioned = UNKNOWN_CODES[i % len(UNKNOWN_CODES)]
+            elif code_noise[j] < unknown_code_rate + swapped_prefix_rate:
+                mentioned = _swap_prefix(sku)
+            else:
+                mentioned = sku
+            topic = topics[topic_choice[j]]
+            templates = DESCRIPTION_TEMPLATES[topic]
+            description = templates[int(template_choice[j] * len(templates))].format(sku=mentioned, brand=brand, model=model)
+            created_at = start + timedelta(seconds=int(created_offsets[j]))
+            updated_at = created_at + timedelta(seconds=int(update_delays[j]))
+            ticket_id = start_id + i
+            yield {
+                'url': f"https://aerosus.zendesk.com/api/v2/tickets/{ticket_id}.json",
+                'id': ticket_id,
+                'created_at': created_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'updated_at': updated_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'type': 'question' if topic == 'Question' else 'problem',
+                'subject': f"{categories[product]} - {mentioned}",
+                'description': description,
+                'status': STATUSES[statuses[j]],
+                'priority': PRIORITIES[priorities[j]],
+                'tags': [categories[product].lower().replace(' ', '_'), brand.lower().replace(' ', '_')],
+                'via': {'channel': CHANNELS[channels[j]], 'source': {'from': {}, 'to': {}, 'rel': None}},
+                'custom_fields': [
+                    {'id': SKU_FIELD_ID, 'value': sku if has_sku_field[j] else None},
+                    {'id': ORDER_FIELD_ID, 'value': f"AE{ticket_id:09d}"},
+                ],
+                'requester_id': int(requesters[j]),
+                'assignee_id': 500 + i % 40,
+                'group_id': 20 + i % 5,
+            }
+
+
+def write_zendesk_export(jsonl_file_path, n_tickets, catalog, seed=0, junk_rate=0.001, **ticket_options):
+    """
+    Writes a JSON Lines export with one ticket per line and, at roughly
+    junk_rate, non-JSON lines (URLs, headers) like the real export has.
+    Tickets are streamed to disk, so any size fits in memory.
+    """
+    rng = np.random.default_rng(seed + 1)
+    with open(jsonl_file_path, 'w', encoding='utf-8') as f:
+        f.write(JUNK_LINES[0].format(n=0) + '\n')
+        for i, ticket in enumerate(generate_tickets(n_tickets, catalog, seed=seed, **ticket_options)):
+            if rng.random() < junk_rate:
+                f.write(JUNK_LINES[i % len(JUNK_LINES)].format(n=i) + '\n')
+            f.write(json.dumps(ticket) + '\n')
+
+
+# --- MAIN EXECUTION ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic Zendesk export and product catalog.")
+    parser.add_argument('--tickets', type=int, default=10000)
+    parser.add_argument('--products', type=int, default=None, help="defaults to one product per 500 tickets (at least 20)")
+    parser.add_argument('--output', default='synthetic_tickets.jsonl')
+    parser.add_argument('--catalog', default='synthetic_products.csv')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    n_products = args.products or max(20, args.tickets // 500)
+    catalog = generate_product_catalog(n_products, seed=args.seed)
+    catalog.to_csv(args.catalog, index=False)
+    write_zendesk_export(args.output, args.tickets, catalog, seed=args.seed)
+    print(f"✅ Wrote {args.tickets} tickets to '{args.output}' and {n_products} products to '{args.catalog}'.")
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import re
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import CountVectorizer
+
+# Tokens are runs of word characters in the cleaned text
+TOKEN_PATTERN = r'(?u)\w+'
+
+
+def clean_descriptions(descriptions):
+    """
+    Lowercases the whole column and strips punctuation in one batch, matching the
+    cleaning the dashboard used to do per row before tokenizing.
+    """
+    return descriptions.fillna('').astype(str).str.lower().str.replace(r'[^\w\s]', '', regex=True)
+
+
+class TermIndex:
+    """
+    Vocabulary plus a sparse CSR term-document matrix (one row per ticket, in the
+    order of the dashboard DataFrame). Word counts for any subset of tickets are
+    the sum of a row slice, so no token lists are kept per ticket. The raw
+    descriptions are kept only to order tied terms within a single ticket.
+    """
+
+    def __init__(self, vocabulary, matrix, documents=None):
+        self.vocabulary = vocabulary
+        self.matrix = matrix
+        self.documents = documents
+
+    def term_counts(self, rows=None):
+        subset = self.matrix if rows is None else self.matrix[np.asarray(rows, dtype=np.intp)]
+        return np.asarray(subset.sum(axis=0)).ravel()
+
+    def first_rows(self, rows, terms):
+        """
+        For each term, the position within rows of the first ticket containing it.
+        """
+        subset = self.matrix if rows is None else self.matrix[np.asarray(rows, dtype=np.intp)]
+        columns = subset[:, terms].tocsc()
+        columns.sort_indices()
+        return columns.indices[columns.indptr[:-1]]
+
+    def token_positions(self, row, terms):
+        """
+        Position of the first occurrence of each term in one ticket's description.
+        """
+        tokens = re.findall(TOKEN_PATTERN, clean_descriptions(self.documents.iloc[[row]]).iloc[0])
+        first = {}
+        for position, token in enumerate(tokens):
+            first.setdefault(token, position)
+        return [first.get(self.vocabulary[term], len(tokens)) for term in terms]
+
+    def top_terms(self, rows=None, n=10):
+        """
+        Returns the n most frequent (term, count) pairs for the given row
+        positions, or for every ticket when rows is None. Ties are broken like
+        Counter.most_common over the tickets in rows order: the term seen first
+        wins, i.e. the one whose first ticket comes earliest, then the one
+        appearing earlier in that ticket's text.
+        """
+        counts = self.term_counts(rows)
+        present = np.flatnonzero(counts)
+        if len(present) > n:
+            # Only terms tied with the n-th highest count can be affected by the tie-break
+            cutoff = np.partition(counts[present], len(present) - n)[len(present) - n]
+            present = present[counts[present] >= cutoff]
+        present_counts = counts[present]
+        first = self.first_rows(rows, present)
+        positions = np.zeros(len(present), dtype=np.intp)
+        if self.documents is not None:
+            # Terms tied on count and first ticket are ordered by where they appear in it;
+            # only those few tickets are tokenized again
+            tied = pd.DataFrame({'count': present_counts, 'first': first}).duplicated(keep=False).to_numpy()
+            for first_row in np.unique(first[tied]):
+                members = np.flatnonzero(tied & (first == first_row))
+                ticket = first_row if rows is None else rows[first_row]
+                positions[members] = self.token_positions(ticket, present[members])
+        order = present[np.lexsort((present, positions, first, -present_counts))][:n]
+        return [(self.vocabulary[i], int(counts[i])) for i in order]
+
+    def top_terms_frame(self, rows=None, n=10, columns=('Word', 'Frequency')):
+        return pd.DataFrame(self.top_terms(rows, n), columns=list(columns))
+
+
+def build_term_index(descriptions, stop_words):
+    """
+    Tokenizes all descriptions in one batch and builds the term index.
+    Tokens are runs of word characters after punctuation removal, with stop words dropped.
+    """
+    vectorizer = CountVectorizer(lowercase=False, token_pattern=TOKEN_PATTERN, stop_words=sorted(stop_words), dtype=np.int32)
+    documents = descriptions.reset_index(drop=True)
+    try:
+        matrix = vectorizer.fit_transform(clean_descriptions(descriptions)).tocsr()
+    except ValueError:
+        # No ticket contains a single non-stop-word token
+        return TermIndex(np.array([], dtype=object), csr_matrix((len(descriptions), 0), dtype=np.int32), documents)
+    return TermIndex(vectorizer.get_feature_names_out(), matrix, documents)
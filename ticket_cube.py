@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+# Dimensions of the aggregate cube; product_name rides along with sku for display
+CUBE_DIMENSIONS = ['day', 'brand', 'sku', 'product_name', 'topic']
+
+# Dimensions of the rollup behind the dashboard-wide metrics and trend
+ROLLUP_DIMENSIONS = ['day', 'brand', 'topic']
+
+
+def build_ticket_cube(df):
+    """
+    Aggregates tickets into counts per day x brand x sku x topic, sorted by day.
+    The product views are answered from this table, so their cost depends on
+    the number of cells and not on the number of tickets. Each cell also keeps
+    the row position of its first ticket, which orders ties like value_counts.
+    The dashboard rebuilds the cube with each load of a new store version.
+    """
+    keys = df[['brand', 'sku', 'product_name', 'topic']].copy()
+    keys['day'] = df['created_date'].dt.normalize()
+    keys['row'] = np.arange(len(df))
+    cube = keys.groupby(CUBE_DIMENSIONS, observed=True, dropna=False)['row'].agg(tickets='size', first_row='min').reset_index()
+    return cube[CUBE_DIMENSIONS + ['tickets', 'first_row']]
+
+
+def build_topic_rollup(cube):
+    """
+    Rolls the cube up to day x brand x topic, sorted by day, with each cell's
+    month precomputed for the trend chart. Its size is bounded by days x brands
+    x topics, however large the catalog is.
+    """
+    rollup = cube.groupby(ROLLUP_DIMENSIONS, observed=True, dropna=False)['tickets'].sum().reset_index()
+    months = rollup['day'].drop_duplicates()
+    month_labels = pd.Series(months.dt.strftime('%Y-%m').to_numpy(), index=months.to_numpy())
+    rollup['month'] = pd.Categorical(month_labels.reindex(rollup['day'].to_numpy()).to_numpy())
+    return rollup[ROLLUP_DIMENSIONS + ['month', 'tickets']]
+
+
+def slice_cube(cube, start_date, end_date, brand=None):
+    """
+    Cells for the sidebar filters: days in [start_date, end_date] and, unless
+    brand is None, a single brand. The cube and the rollup are sorted by day,
+    so the date range is found by binary search.
+    """
+    days = cube['day'].to_numpy()
+    lo = np.searchsorted(days, np.datetime64(pd.Timestamp(start_date), 'ns'), side='left')
+    hi = np.searchsorted(days, np.datetime64(pd.Timestamp(end_date), 'ns'), side='right')
+    cells = cube.iloc[lo:hi]
+    if brand is not None:
+        cells = cells[cells['brand'] == brand]
+    return cells
+
+
+def total_tickets(cube_slice):
+    return int(cube_slice['tickets'].sum())
+
+
+def topic_totals(cube_slice):
+    return cube_slice.groupby('topic', observed=True)['tickets'].sum()
+
+
+def topic_rates(cube_slice, topics):
+    """
+    Percentage of tickets in each of the given topics, 0 for an empty slice.
+    """
+    total = total_tickets(cube_slice)
+    totals = topic_totals(cube_slice)
+    return {topic: int(totals.get(topic, 0)) / total * 100 if total > 0 else 0 for topic in topics}
+
+
+def monthly_topic_trend(rollup_slice, topics):
+    """
+    Tickets per month for each topic, with one '<Topic>_Tickets' column per
+    topic. Expects the month column of the rollup.
+    """
+    trend = rollup_slice.groupby(['month', 'topic'], observed=True)['tickets'].sum().unstack(fill_value=0)
+    trend.columns = trend.columns.astype(str)
+    trend = trend.reindex(columns=list(topics), fill_value=0)
+    trend.columns = [f"{topic}_Tickets" for topic in topics]
+    trend.index = trend.index.astype(str)
+    return trend.rename_axis('month').reset_index()
+
+
+def top_products(cube_slice, topic, n=5):
+    topic_cells = cube_slice[cube_slice['topic'] == topic]
+    products = topic_cells.groupby('product_name').agg(tickets=('tickets', 'sum'), first_row=('first_row', 'min'))
+    # Ties go to the product whose first ticket comes first, as in value_counts
+    products = products.sort_values(['tickets', 'first_row'], ascending=[False, True])
+    return products['tickets'].head(n)
+
+
+def products_in(cube_slice):
+    return sorted(cube_slice['product_name'].dropna().unique())
+
+
+def product_cells(cube_slice, product_name):
+    return cube_slice[cube_slice['product_name'] == product_name]
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import threading
+from collections import OrderedDict
+
+# Columns with a precomputed row-position index
+INDEXED_COLUMNS = ['brand', 'product_name', 'topic']
+
+# Number of sidebar filter results kept in the LRU cache
+FILTER_CACHE_SIZE = 64
+
+_NO_ROWS = np.array([], dtype=np.intp)
+
+
+def _build_postings(series):
+    """
+    Factorizes a column into categorical codes and, for every value, the sorted
+    row positions holding it. Missing values get code -1 and no postings.
+    """
+    codes, uniques = pd.factorize(series, sort=True)
+    uniques = np.asarray(uniques, dtype=object)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    postings = {value: order[bounds[i]:bounds[i + 1]] for i, value in enumerate(uniques)}
+    return codes, uniques, postings
+
+
+class TicketFilterIndex:
+    """
+    Row-position index over the dashboard DataFrame, which must be sorted by
+    created_date and have a RangeIndex. Date ranges are found by binary search,
+    brand/product/topic through their postings, and page selections are kept in
+    a bounded LRU cache keyed on (start, end, brand, page). Selections are
+    read-only arrays of row positions; the frame itself is never copied.
+    """
+
+    def __init__(self, df, cache_size=FILTER_CACHE_SIZE):
+        self.dates = df['created_date'].to_numpy(dtype='datetime64[ns]')
+        self.codes = {}
+        self.uniques = {}
+        self.postings = {}
+        for col in INDEXED_COLUMNS:
+            self.codes[col], self.uniques[col], self.postings[col] = _build_postings(df[col])
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def min_date(self):
+        if len(self.dates) == 0:
+            return None
+        return pd.Timestamp(self.dates[0]).date()
+
+    def values(self, column):
+        return list(self.uniques[column])
+
+    def date_range(self, start_date, end_date):
+        """
+        Half-open row range [lo, hi) of tickets created on start_date through end_date.
+        """
+        lo = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start_date), 'ns'), side='left')
+        hi = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end_date) + pd.Timedelta(days=1), 'ns'), side='left')
+        return lo, hi
+
+    def select(self, start_date, end_date, brand=None, topic=None):
+        lo, hi = self.date_range(start_date, end_date)
+        rows = None
+        for col, value in [('brand', brand), ('topic', topic)]:
+            if value is None:
+                continue
+            postings = self.postings[col].get(value, _NO_ROWS)
+            in_range = postings[np.searchsorted(postings, lo):np.searchsorted(postings, hi)]
+            rows = in_range if rows is None else np.intersect1d(rows, in_range, assume_unique=True)
+        return np.arange(lo, hi, dtype=np.intp) if rows is None else rows
+
+    def restrict(self, rows, column, values):
+        """
+        Keeps only the rows whose column value is one of values.
+        """
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+        value_codes = np.flatnonzero(np.isin(self.uniques[column], list(values)))
+        return rows[np.isin(self.codes[column][rows], value_codes)]
+
+    def page_selection(self, start_date, end_date, brand, page, topic=None):
+        """
+        Cached row positions for one sidebar state. A brand of None means all
+        brands; topic narrows the selection for topic analysis pages.
+        """
+        key = (start_date, end_date, brand, page)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+        rows = self.select(start_date, end_date, brand=brand, topic=topic)
+        rows.setflags(write=False)
+        with self._lock:
+            self._cache[key] = rows
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return rows
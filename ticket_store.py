@@ -0,0 +1,227 @@
+import pandas as pd
+import pyarrow.parquet as pq
+import json
+import os
+import time
+
+# Default location of the columnar ticket store
+DEFAULT_STORE_DIR = 'zendesk_ticket_store'
+
+# Per-partition index of (id, updated_at) used to find changed tickets
+INDEX_FILE = '_index.parquet'
+
+# Low-cardinality string columns kept dictionary-encoded (pandas categoricals)
+CATEGORICAL_COLUMNS = ['status', 'priority', 'type', 'via.channel', 'brand', 'sku', 'topic']
+
+# A month partition is compacted into one file once it holds more part files than this
+MAX_FILES_PER_PARTITION = 8
+
+UNKNOWN_MONTH = 'unknown'
+
+
+def _partition_dir(store_dir, month):
+    return os.path.join(store_dir, f"created_month={month}")
+
+
+def _partition_months(store_dir):
+    if not os.path.isdir(store_dir):
+        return []
+    return sorted(
+        name.split('=', 1)[1] for name in os.listdir(store_dir)
+        if name.startswith('created_month=') and os.path.isdir(os.path.join(store_dir, name))
+    )
+
+
+def _part_files(store_dir, month):
+    partition_dir = _partition_dir(store_dir, month)
+    # Part names carry a nanosecond timestamp, so name order is write order
+    return [
+        os.path.join(partition_dir, name) for name in sorted(os.listdir(partition_dir))
+        if name.startswith('part-') and name.endswith('.parquet')
+    ]
+
+
+def _utc_timestamp(value):
+    if value is None:
+        return None
+    value = pd.Timestamp(value)
+    return value.tz_localize('UTC') if value.tzinfo is None else value.tz_convert('UTC')
+
+
+def _to_json_text(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+def prepare_tickets(df):
+    """
+    Converts a normalized ticket frame into the store's column layout: UTC
+    timestamps, nested list/dict values serialized as JSON text, categorical
+    string columns and the created_month partition key.
+    """
+    df = df.copy()
+    for col in ['created_at', 'updated_at']:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce', utc=True, format='ISO8601')
+    if 'created_at' not in df.columns:
+        df['created_at'] = pd.NaT
+    if 'updated_at' not in df.columns:
+        df['updated_at'] = df['created_at']
+    else:
+        df['updated_at'] = df['updated_at'].fillna(df['created_at'])
+    for col in df.columns[df.dtypes == object]:
+        if df[col].map(lambda value: isinstance(value, (list, dict))).any():
+            df[col] = df[col].map(_to_json_text)
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    month_key = df['created_at'].dt.year * 100 + df['created_at'].dt.month
+    df['created_month'] = month_key.map(
+        lambda key: UNKNOWN_MONTH if pd.isna(key) else f"{int(key) // 100:04d}-{int(key) % 100:02d}"
+    )
+    return df
+
+
+def _latest_versions(df):
+    # Keeps one row per ticket id: the latest updated_at, later rows winning ties
+    return df.sort_values('updated_at', kind='stable').drop_duplicates('id', keep='last')
+
+
+def _load_index(store_dir, month):
+    index_path = os.path.join(_partition_dir(store_dir, month), INDEX_FILE)
+    if os.path.exists(index_path):
+        return pd.read_parquet(index_path)
+    return pd.DataFrame({'id': pd.Series(dtype='int64'), 'updated_at': pd.Series(dtype='datetime64[ns, UTC]')})
+
+
+def _migrate_store_index(store_dir):
+    # Stores written before the index was split by month keep one index at the top level
+    index_path = os.path.join(store_dir, INDEX_FILE)
+    if not os.path.exists(index_path):
+        return
+    for month, month_index in pd.read_parquet(index_path).groupby('created_month', sort=False):
+        os.makedirs(_partition_dir(store_dir, month), exist_ok=True)
+        month_index[['id', 'updated_at']].to_parquet(os.path.join(_partition_dir(store_dir, month), INDEX_FILE), index=False)
+    os.remove(index_path)
+
+
+def store_version(store_dir):
+    """
+    Cheap identifier of the store's contents, for keying caches of loaded data:
+    the number of index files and the newest of their modification times.
+    upsert_tickets rewrites a month's index after every write, so the version
+    changes whenever tickets are added or updated. None for a missing store.
+    """
+    if not os.path.isdir(store_dir):
+        return None
+    index_paths = [os.path.join(store_dir, INDEX_FILE)]
+    index_paths += [os.path.join(_partition_dir(store_dir, month), INDEX_FILE) for month in _partition_months(store_dir)]
+    mtimes = [os.stat(path).st_mtime_ns for path in index_paths if os.path.exists(path)]
+    return (len(mtimes), max(mtimes, default=0))
+
+
+def compact_partition(store_dir, month):
+    """
+    Rewrites all part files of a month partition as a single file holding only
+    the latest version of each ticket.
+    """
+    part_files = _part_files(store_dir, month)
+    if len(part_files) <= 1:
+        return
+    partition_df = _latest_versions(pd.concat([pd.read_parquet(path) for path in part_files], ignore_index=True))
+    partition_df.to_parquet(os.path.join(_partition_dir(store_dir, month), f"part-{time.time_ns()}.parquet"), index=False)
+    for path in part_files:
+        os.remove(path)
+
+
+def upsert_tickets(store_dir, chunks):
+    """
+    Adds new tickets and newer versions of known tickets (by id and updated_at)
+    to the store. `chunks` is a DataFrame or an iterable of DataFrames; only the
+    changed rows are written, each as a new part file in its month partition.
+    Versions of one ticket repeated within a run are resolved when reading.
+    Each month partition keeps its own (id, updated_at) index, which is read
+    and rewritten per chunk, so memory is bounded by the chunk and the largest
+    month rather than the whole store. A ticket's versions share a month as
+    long as its created_at does not change.
+    Returns the number of ticket rows written.
+    """
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+    os.makedirs(store_dir, exist_ok=True)
+    _migrate_store_index(store_dir)
+    touched_months = set()
+    written = 0
+    for chunk_df in chunks:
+        if 'created_month' not in chunk_df.columns:
+            chunk_df = prepare_tickets(chunk_df)
+        chunk_df = _latest_versions(chunk_df.dropna(subset=['id']))
+        for month, month_df in chunk_df.groupby('created_month', sort=False):
+            index_df = _load_index(store_dir, month)
+            previous = index_df.set_index('id')['updated_at'].reindex(month_df['id']).set_axis(month_df.index)
+            month_df = month_df[previous.isna() | (month_df['updated_at'] > previous)]
+            if month_df.empty:
+                continue
+            partition_dir = _partition_dir(store_dir, month)
+            os.makedirs(partition_dir, exist_ok=True)
+            month_df.drop(columns='created_month').to_parquet(os.path.join(partition_dir, f"part-{time.time_ns()}.parquet"), index=False)
+            index_df = _latest_versions(pd.concat([index_df, month_df[['id', 'updated_at']]], ignore_index=True))
+            index_df.to_parquet(os.path.join(partition_dir, INDEX_FILE), index=False)
+            touched_months.add(month)
+            written += len(month_df)
+    for month in touched_months:
+        if len(_part_files(store_dir, month)) > MAX_FILES_PER_PARTITION:
+            compact_partition(store_dir, month)
+    return written
+
+
+# Column types of an empty load; columns not listed here are returned as object
+EMPTY_STORE_DTYPES = {'id': 'int64', 'created_at': 'datetime64[ns, UTC]', 'updated_at': 'datetime64[ns, UTC]'}
+
+
+def _empty_tickets(columns=None):
+    # Typed like a loaded store, so callers can use .dt on the timestamps of an empty result
+    columns = list(EMPTY_STORE_DTYPES) if columns is None else list(columns)
+    return pd.DataFrame({col: pd.Series(dtype=EMPTY_STORE_DTYPES.get(col, object)) for col in columns})
+
+
+def load_tickets(store_dir, columns=None, start=None, end=None):
+    """
+    Loads tickets from the store, reading only the requested columns and only the
+    month partitions that overlap [start, end]. Rows are filtered to the exact
+    created_at range and older versions of updated tickets are dropped.
+    """
+    start, end = _utc_timestamp(start), _utc_timestamp(end)
+    months = [
+        month for month in _partition_months(store_dir)
+        if month != UNKNOWN_MONTH or (start is None and end is None)
+    ]
+    if start is not None:
+        months = [month for month in months if month >= start.strftime('%Y-%m')]
+    if end is not None:
+        months = [month for month in months if month <= end.strftime('%Y-%m')]
+
+    read_columns = None if columns is None else list(dict.fromkeys(list(columns) + ['id', 'updated_at', 'created_at']))
+    frames = []
+    for month in months:
+        for path in _part_files(store_dir, month):
+            if read_columns is None:
+                frames.append(pd.read_parquet(path))
+            else:
+                available = set(pq.read_schema(path).names)
+                frames.append(pd.read_parquet(path, columns=[col for col in read_columns if col in available]))
+    if not frames:
+        return _empty_tickets(columns)
+    df = _latest_versions(pd.concat(frames, ignore_index=True))
+    if start is not None:
+        df = df[df['created_at'] >= start]
+    if end is not None:
+        df = df[df['created_at'] <= end]
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    df = df.sort_values('created_at', kind='stable').reset_index(drop=True)
+    if columns is not None:
+        df = df.reindex(columns=list(columns))
+    return df